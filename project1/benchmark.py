@@ -0,0 +1,245 @@
+# benchmark.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Runs every search function in search.py (and the problem-specific solvers
+in searchAgents.py) on every search problem and
+heuristic it works with, over the layouts in layouts/, without graphics.
+Each combination is searched several times; the median time, the search
+statistics (see search.searchWithStats), the plan cost and the peak memory
+are recorded.
+
+    python benchmark.py -n 3 -o baseline.json
+    python benchmark.py -n 3 -b baseline.json -l bigMaze,mediumCorners
+
+Given a baseline from an earlier run, the results are compared against it and
+the exit status is 1 if any combination got slower, expanded more nodes, used
+more memory or found a costlier plan by more than the tolerance.
+"""
+
+import contextlib
+import inspect
+import io
+import json
+import optparse
+import os
+import sys
+import time
+import tracemalloc
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+# Every search in search.py by its abbreviation (the aliases at the end of the
+# file), plus the problem-specific solvers SearchAgent accepts from
+# searchAgents.py, so that new searches are benchmarked as soon as they exist.
+SEARCH_FUNCTIONS = [name for name, value in vars(search).items()
+                    if inspect.isfunction(value) and value.__name__ != name] + \
+                   [name for name, value in vars(searchAgents).items()
+                    if inspect.isfunction(value) and name.endswith('Search')]
+
+PROBLEM_HEURISTICS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic', 'landmarkHeuristic'],
+    'JunctionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic', 'landmarkHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic'],
+    'BitmaskFoodSearchProblem': ['nullHeuristic', 'foodHeuristic'],
+}
+
+# Searches that only work on some problems: jps and hpastar need unit-cost
+# moves on the walls grid, the bidirectional searches and D* Lite need a
+# single goal state and getPredecessors, and heldKarpFoodSearch solves food
+# problems only.
+SEARCH_PROBLEMS = {
+    'jps': ['PositionSearchProblem'],
+    'hpastar': ['PositionSearchProblem'],
+    'bibfs': ['PositionSearchProblem'],
+    'biastar': ['PositionSearchProblem'],
+    'dstar': ['PositionSearchProblem'],
+    'heldKarpFoodSearch': ['FoodSearchProblem', 'BitmaskFoodSearchProblem'],
+}
+
+METRICS = ['time', 'expanded', 'memory', 'cost']
+
+TRACEMALLOC_SLOWDOWN = 4 # the memory-measuring run gets this many times the time limit
+
+def getSearchFunction(name):
+    "Returns the search function called name in search.py or searchAgents.py."
+    if name in dir(search):
+        return getattr(search, name)
+    return getattr(searchAgents, name)
+
+def combinations(layoutNames, functionNames, problemNames):
+    "Yields (layout, problem, function, heuristic) names for every run to make."
+    for layoutName in layoutNames:
+        for problemName in problemNames:
+            for functionName in functionNames:
+                if problemName not in SEARCH_PROBLEMS.get(functionName, [problemName]):
+                    continue
+                function = getSearchFunction(functionName)
+                if 'heuristic' in function.__code__.co_varnames:
+                    heuristics = PROBLEM_HEURISTICS[problemName]
+                else:
+                    heuristics = [None]
+                for heuristicName in heuristics:
+                    yield layoutName, problemName, functionName, heuristicName
+
+def runSearch(gameState, problemName, functionName, heuristicName):
+    """
+    Builds a fresh problem and searches it once, returning the plan's cost and
+    the search's SearchStats.  Anything the problem or search prints is muted.
+
+    Every search reports the nodes it expanded, including the ones that never
+    call getSuccessors:
+
+    >>> gameState = pacman.GameState()
+    >>> gameState.initialize(layout.getLayout('tinyCorners'), 0)
+    >>> [key for key in combinations(['tinyCorners'], SEARCH_FUNCTIONS, sorted(PROBLEM_HEURISTICS))
+    ...  if runSearch(gameState, *key[1:])[1].expanded == 0]
+    []
+    """
+    function = getSearchFunction(functionName)
+    heuristic = None
+    if heuristicName is not None:
+        if heuristicName in dir(searchAgents):
+            heuristic = getattr(searchAgents, heuristicName)
+        else:
+            heuristic = getattr(search, heuristicName)
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = getattr(searchAgents, problemName)(gameState)
+        actions, stats = search.searchWithStats(function, problem, heuristic)
+        if 'expandActions' in dir(problem):
+            actions = problem.expandActions(actions)
+        cost = problem.getCostOfActions(actions)
+    return cost, stats
+
+def benchmark(gameState, problemName, functionName, heuristicName, repeats, timeLimit):
+    """
+    Runs one combination repeats times, plus once more under tracemalloc to
+    measure its peak memory, and returns the result record.  If a run takes
+    longer than timeLimit seconds the combination is given up on.
+    """
+    run = util.TimeoutFunction(runSearch, timeLimit)
+    tracedRun = util.TimeoutFunction(runSearch, timeLimit * TRACEMALLOC_SLOWDOWN)
+    times = []
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            cost, stats = run(gameState, problemName, functionName, heuristicName)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            tracedRun(gameState, problemName, functionName, heuristicName)
+            memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except util.TimeoutFunctionException:
+        return {'status': 'timeout'}
+    except Exception as e:
+        return {'status': 'error', 'error': '%s: %s' % (type(e).__name__, e)}
+    times.sort()
+    result = stats.asDict()
+    result.update(status='ok', time=times[len(times) // 2], memory=memory, cost=cost)
+    return result
+
+def findRegressions(results, baseline, tolerance, minTime):
+    """
+    Returns (key, metric, old value, new value) for every metric that got worse
+    than the baseline by more than the tolerance (a fraction).  Times also have
+    to be worse by more than minTime seconds, so that quick runs do not fail on
+    noise.  A run that used to finish and no longer does is a regression too.
+    """
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        old, new = baseline[key], results[key]
+        if old['status'] != 'ok':
+            continue
+        if new['status'] != 'ok':
+            regressions.append((key, 'status', old['status'], new['status']))
+            continue
+        for metric in METRICS:
+            limit = old[metric] * (1 + tolerance)
+            if metric == 'time':
+                limit = max(limit, old[metric] + minTime)
+            if new[metric] > limit + 1e-9:
+                regressions.append((key, metric, old[metric], new[metric]))
+    return regressions
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description='Benchmark the search functions on the bundled layouts')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layouts to run on (default: all of layouts/)')
+    parser.add_option('-f', '--functions', dest='functions', default=','.join(SEARCH_FUNCTIONS),
+                      help='comma separated search functions (default: %default)')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(sorted(PROBLEM_HEURISTICS)),
+                      help='comma separated search problems (default: %default)')
+    parser.add_option('-n', '--repeats', dest='repeats', type='int', default=3,
+                      help='times to run each combination (default: %default)')
+    parser.add_option('-t', '--timeLimit', dest='timeLimit', type='int', default=5,
+                      help='seconds before a single run is given up on (default: %default)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='write the results as JSON to this file, e.g. to use as a baseline')
+    parser.add_option('-b', '--baseline', dest='baseline', default=None,
+                      help='JSON results of an earlier run to check for regressions against')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=0.25,
+                      help='fraction by which a metric may exceed the baseline (default: %default)')
+    parser.add_option('--minTime', dest='minTime', type='float', default=0.01,
+                      help='seconds by which a time may exceed the baseline regardless (default: %default)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    if options.layouts is None:
+        layoutDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts')
+        options.layouts = ','.join(sorted(name[:-4] for name in os.listdir(layoutDir) if name.endswith('.lay')))
+    return options
+
+def runBenchmarks(options):
+    results, gameStates = {}, {}
+    for layoutName, problemName, functionName, heuristicName in combinations(
+            options.layouts.split(','), options.functions.split(','), options.problems.split(',')):
+        if layoutName not in gameStates:
+            gameStates[layoutName] = pacman.GameState()
+            gameStates[layoutName].initialize(layout.getLayout(layoutName), 0)
+        gameState = gameStates[layoutName]
+        key = '/'.join([layoutName, problemName, functionName, heuristicName or '-'])
+        result = benchmark(gameState, problemName, functionName, heuristicName, options.repeats, options.timeLimit)
+        results[key] = result
+        if result['status'] == 'ok':
+            print('%-70s %9.4fs %9d expanded %10d bytes  cost %g' %
+                  (key, result['time'], result['expanded'], result['memory'], result['cost']))
+        else:
+            print('%-70s %s' % (key, result.get('error', result['status'])))
+        sys.stdout.flush()
+    return results
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    results = runBenchmarks(options)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        regressions = findRegressions(results, baseline, options.tolerance, options.minTime)
+        for key, metric, old, new in regressions:
+            print('REGRESSION %s %s: %s -> %s' % (key, metric, old, new))
+        print('%d regression(s) against %s' % (len(regressions), options.baseline))
+        if regressions:
+            sys.exit(1)
@@ -13,7 +13,9 @@
 
 
 import search
+import util
 import random
+import collections
 
 # Module Classes
 
@@ -196,7 +198,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -262,14 +264,102 @@ def createRandomEightPuzzle(moves=100):
         puzzle = puzzle.result(random.sample(puzzle.legalMoves(), 1)[0])
     return puzzle
 
+# Pattern databases
+
+PATTERNS = [(1, 2, 3, 4), (5, 6, 7, 8)]
+PATTERN_DATABASES = {}
+NEIGHBOR_CELLS = [[cell + step for step in (-3, 3, -1, 1)
+                   if 0 <= cell + step < 9 and (step in (-3, 3) or cell // 3 == (cell + step) // 3)]
+                  for cell in range(9)]
+
+def patternIndex(blank, positions):
+    "Returns the database entry for the blank and the pattern's tiles at these cells (0-8, row by row)."
+    index = blank
+    for position in positions:
+        index = index * 9 + position
+    return index
+
+def buildPatternDatabase(pattern):
+    """
+    Returns the pattern database for a tuple of tiles, as a bytearray indexed
+    by patternIndex: the fewest moves of those tiles that bring them home
+    from wherever they and the blank are, whatever the other tiles do.
+
+    The table is filled by a retrograde breadth-first search from the goal.
+    Moving one of the pattern's tiles costs 1 and moving any other tile is
+    free, so the search is a 0-1 BFS: free moves go to the front of the
+    queue.  Entries no position reaches are left at 255.
+    """
+    table = bytearray([255]) * 9 ** (len(pattern) + 1)
+    goal = (0,) + tuple(pattern) # the blank and the tiles in their goal cells
+    table[patternIndex(goal[0], goal[1:])] = 0
+    queue = collections.deque([goal])
+    while queue:
+        blank, positions = queue[0][0], queue[0][1:]
+        queue.popleft()
+        distance = table[patternIndex(blank, positions)]
+        for cell in NEIGHBOR_CELLS[blank]:
+            if cell in positions:
+                moved = tuple(blank if position == cell else position for position in positions)
+                cost = 1
+            else:
+                moved, cost = positions, 0
+            index = patternIndex(cell, moved)
+            if distance + cost < table[index]:
+                table[index] = distance + cost
+                if cost:
+                    queue.append((cell,) + moved)
+                else:
+                    queue.appendleft((cell,) + moved)
+    return table
+
+def getPatternDatabase(pattern):
+    """
+    Returns the database for a pattern, loading it from util.CACHE_DIR
+    the first time it is asked for, or building and saving it there if it is
+    not on disk yet.
+    """
+    if pattern not in PATTERN_DATABASES:
+        name = 'eightpuzzle-%s.pdb' % ''.join(map(str, pattern))
+        table = util.readCacheFile(name, lambda f: bytearray(f.read()))
+        if table is not None and len(table) != 9 ** (len(pattern) + 1):
+            table = None
+        if table is None:
+            table = buildPatternDatabase(pattern)
+            util.writeCacheFile(name, lambda f: f.write(table))
+        PATTERN_DATABASES[pattern] = table
+    return PATTERN_DATABASES[pattern]
+
+def patternDatabaseHeuristic(state, problem=None):
+    """
+      An additive pattern database heuristic for the EightPuzzleSearchProblem.
+
+    Each tile belongs to one of the disjoint PATTERNS, and each move moves one
+    tile, so the moves the pattern databases count for different patterns
+    never overlap and their sum is admissible.  It is consistent too, and at
+    least the Manhattan distance, which counts each tile as if the others
+    were not there.
+
+    >>> patternDatabaseHeuristic(loadEightPuzzle(0))
+    1
+    """
+    cells = [0] * 9
+    for row in range(3):
+        for col in range(3):
+            cells[state.cells[row][col]] = row * 3 + col
+    total = 0
+    for pattern in PATTERNS:
+        total += getPatternDatabase(pattern)[patternIndex(cells[0], [cells[tile] for tile in pattern])]
+    return total
+
 if __name__ == '__main__':
     puzzle = createRandomEightPuzzle(25)
     print('A random puzzle:')
     print(puzzle)
 
     problem = EightPuzzleSearchProblem(puzzle)
-    path = search.breadthFirstSearch(problem)
-    print('BFS found a path of %d moves: %s' % (len(path), str(path)))
+    path = search.aStarSearch(problem, patternDatabaseHeuristic)
+    print('A* found a path of %d moves: %s' % (len(path), str(path)))
     curr = puzzle
     i = 1
     for a in path:
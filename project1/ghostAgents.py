@@ -18,6 +18,7 @@ from game import Directions
 import random
 from util import manhattanDistance
 import util
+import searchAgents
 
 class GhostAgent( Agent ):
     def __init__( self, index ):
@@ -64,7 +65,7 @@ class DirectionalGhost( GhostAgent ):
         pacmanPosition = state.getPacmanPosition()
 
         # Select best actions given the state
-        distancesToPacman = [manhattanDistance( pos, pacmanPosition ) for pos in newPositions]
+        distancesToPacman = [self.getDistanceToPacman( pos, pacmanPosition ) for pos in newPositions]
         if isScared:
             bestScore = max( distancesToPacman )
             bestProb = self.prob_scaredFlee
@@ -79,3 +80,21 @@ class DirectionalGhost( GhostAgent ):
         for a in legalActions: dist[a] += ( 1-bestProb ) / len(legalActions)
         dist.normalize()
         return dist
+
+    def getDistanceToPacman( self, pos, pacmanPosition ):
+        return manhattanDistance( pos, pacmanPosition )
+
+class MazeGhost( DirectionalGhost ):
+    """
+    A DirectionalGhost that measures its distance to Pacman through the maze
+    rather than as the crow flies, so it does not get stuck behind walls.
+    """
+    def getDistribution( self, state ):
+        self.distances = searchAgents.getMazeDistances( state )
+        return DirectionalGhost.getDistribution( self, state )
+
+    def getDistanceToPacman( self, pos, pacmanPosition ):
+        # Scared ghosts move at half speed and can sit between two cells
+        if pos[0] != int( pos[0] ) or pos[1] != int( pos[1] ):
+            return manhattanDistance( pos, pacmanPosition )
+        return self.distances.getDistance( ( int( pos[0] ), int( pos[1] ) ), pacmanPosition )
@@ -523,6 +523,8 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--searchStats', dest='searchStats', type='choice', choices=['json'],
+                      help='Print the statistics of a SearchAgent\'s search in this format (json)', default=None)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -545,6 +547,9 @@ def readCommand( argv ):
         if 'numTraining' not in agentOpts: agentOpts['numTraining'] = options.numTraining
     pacman = pacmanType(**agentOpts) # Instantiate Pacman with agentArgs
     args['pacman'] = pacman
+    if options.searchStats != None:
+        if not hasattr(pacman, 'searchStats'): raise Exception('--searchStats requires a SearchAgent')
+        pacman.searchStats, pacman.layoutName = options.searchStats, options.layout
 
     # Don't display training games
     if 'numTrain' in agentOpts:
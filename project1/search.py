@@ -17,6 +17,16 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import collections
+import heapq
+import multiprocessing
+import pickle
+import queue
+import struct
+import sys
+import tempfile
+import time
+import traceback
 import util
 
 class SearchProblem:
@@ -72,6 +82,89 @@ def tinyMazeSearch(problem):
     w = Directions.WEST
     return  [s, s, w, s, w, w, s, w]
 
+class Node:
+    """
+    A node in the search tree.  Rather than carrying a copy of the whole action
+    list, each node remembers the node it was generated from; the list of
+    actions is only rebuilt (by following the parent pointers) once a goal has
+    been reached.
+    """
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent=None, action=None, cost=0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost    # g(n): total cost of the actions leading here
+
+    def path(self):
+        "Returns the list of actions leading from the root to this node."
+        actions = []
+        node = self
+        while node.parent is not None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+def graphSearch(problem, frontier, priorityFunction=None):
+    """
+    Generic graph search shared by all of the search functions below.
+
+    frontier: an empty container with push(node), pop() and isEmpty(), such as
+    util.Stack, util.Queue or util.PriorityQueueWithFunction.  The frontier's
+    queuing policy is the only thing that distinguishes the algorithms.
+
+    priorityFunction: if given, frontier must be a util.IndexedPriorityQueue
+    (or a util.BucketQueue or util.RadixHeap), and it holds states rather than
+    nodes.  Each state then has at most one frontier entry, and finding a
+    cheaper path to a queued state lowers the priority of that entry (update)
+    instead of queuing a second copy.  When a priority comes up that the
+    frontier cannot hold, such as a fractional cost in a BucketQueue, the
+    frontier is widened into one that can.
+
+    States are tested for the goal when they are popped, and are expanded at
+    most once; the closed set is a hashed set, so search states must be
+    hashable.
+    """
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    root = Node(startState)
+    openNodes = {} # state -> cheapest node found so far, for keyed frontiers
+    if priorityFunction is None:
+        frontier.push(root)
+    else:
+        openNodes[startState] = root
+        priority = priorityFunction(root)
+        if not frontier.accepts(priority):
+            frontier = frontier.widen(priority)
+        frontier.push(startState, priority)
+    closed = set()
+    while not frontier.isEmpty():
+        if priorityFunction is None:
+            node = frontier.pop()
+        else:
+            node = openNodes.pop(frontier.pop())
+        if problem.isGoalState(node.state):
+            return node.path()
+        if node.state in closed:
+            continue
+        closed.add(node.state)
+        for successor, action, stepCost in problem.getSuccessors(node.state):
+            if successor in closed:
+                continue
+            child = Node(successor, node, action, node.cost + stepCost)
+            if priorityFunction is None:
+                frontier.push(child)
+            elif successor not in openNodes or child.cost < openNodes[successor].cost:
+                openNodes[successor] = child
+                priority = priorityFunction(child)
+                if not frontier.accepts(priority):
+                    frontier = frontier.widen(priority)
+                frontier.update(successor, priority)
+    return []
+
 def depthFirstSearch(problem):
     """
     Search the deepest nodes in the search tree first.
@@ -87,87 +180,19 @@ def depthFirstSearch(problem):
     print("Start's successors:", problem.getSuccessors(problem.getStartState()))
     """
     "*** YOUR CODE HERE ***"
-    if problem.isGoalState(problem.getStartState()):
-        return []
-    #st: ((x,y),[path])
-    st = util.Stack()
-    st.push((problem.getStartState(), []))
-    #print(problem.getSuccessors(problem.getStartState()))
-    visited = []
-    route = []
-    while not st.isEmpty():
-        position,route = st.pop()
-        if problem.isGoalState(position):
-            return route
-        if position not in visited:
-            visited.append(position)
-            successors = problem.getSuccessors(position)
-            for successor in list(successors):
-                if successor[0] not in visited:
-                    updatedRoute = route + [successor[1]]
-                    st.push((successor[0], updatedRoute))
-    return []
-    util.raiseNotDefined()
-    
+    return graphSearch(problem, util.Stack())
+
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
     "*** YOUR CODE HERE ***"
-    if problem.isGoalState(problem.getStartState()):
-        return []
-    #queue: ((x,y),[path])
-    queue = util.Queue()
-    queue.push((problem.getStartState(), []))
-    visited = []
-    route = []
-    while not queue.isEmpty():
-        position,route = queue.pop()
-        if problem.isGoalState(position):
-            return route
-        if position not in visited:
-            visited.append(position)
-            successors = problem.getSuccessors(position)
-            for successor in list(successors):
-                if successor[0] not in visited:
-                    updatedRoute = route + [successor[1]]
-                    queue.push((successor[0], updatedRoute))
-    return []
-    util.raiseNotDefined()
+    return graphSearch(problem, util.Queue())
 
 def uniformCostSearch(problem):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
-    if problem.isGoalState(problem.getStartState()):
-        return []
-    #queue: ((x,y),[path],priority)
-    queue = util.PriorityQueue()
-    queue.push((problem.getStartState(), []), 0)
-    visited = []
-    route = []
-    while not queue.isEmpty():
-        position,route = queue.pop()
-        if problem.isGoalState(position):
-            return route
-        if position not in visited:
-            visited.append(position)
-            successors = problem.getSuccessors(position)
-            for successor in list(successors):
-
-                if successor[0] not in visited and (successor[0] not in (state[2][0] for state in queue.heap)):
-                    updatedRoute = route + [successor[1]]
-                    costPath = problem.getCostOfActions(updatedRoute)
-                    queue.push((successor[0],updatedRoute),costPath)
-
-                elif successor[0] not in visited and (successor[0] in (state[2][0] for state in queue.heap)):
-                    for state in queue.heap:
-                        if state[2][0] == successor[0]:
-                            previousCostPath = problem.getCostOfActions(state[2][1])
-
-                    newCostPath = problem.getCostOfActions(route + [successor[1]])
-                    if previousCostPath > newCostPath:
-                        updatedRoute = route + [successor[1]]
-                        queue.update((successor[0], updatedRoute), newCostPath)
-    return []
-    util.raiseNotDefined()
+    # Step costs are integers in most problems, so start with a bucket queue;
+    # graphSearch moves to a heap if a cost turns out not to be.
+    return graphSearch(problem, util.BucketQueue(), lambda node: node.cost)
 
 def nullHeuristic(state, problem=None):
     """
@@ -175,56 +200,1244 @@ def nullHeuristic(state, problem=None):
     goal in the provided SearchProblem.  This heuristic is trivial.
     """
     return 0
-    
-from util import PriorityQueue
-class MyPriorityQueueWithFunction(PriorityQueue):
-    """
-    Implements a priority queue with the same push/pop signature of the
-    Queue and the Stack classes. This is designed for drop-in replacement for
-    those two classes. The caller has to provide a priority function, which
-    extracts each item's priority.
-    """
-    def  __init__(self, problem, priorityFunction):
-        "priorityFunction (item) -> priority"
-        self.priorityFunction = priorityFunction      # store the priority function
-        PriorityQueue.__init__(self)        # super-class initializer
-        self.problem = problem
-    def push(self, item, heuristic):
-        "Adds an item to the queue with priority from the priority function"
-        PriorityQueue.push(self, item, self.priorityFunction(self.problem,item,heuristic))
-        
-# Calculate f(n) = g(n) + h(n)
-def calculateHeuristic(problem, state, heuristic):
-    return problem.getCostOfActions(state[1]) + heuristic(state[0],problem)
+
+HEURISTIC_CACHE_SIZE = 1 << 20
+
+class MemoizedHeuristic:
+    """
+    A heuristic that remembers its values, so a state regenerated from another
+    parent is not estimated again.  Values are kept for the size most recently
+    used states and thrown away when the heuristic is asked about another
+    problem.  hits and misses count the calls answered from and not from the
+    cache.
+    """
+
+    def __init__(self, heuristic, size=HEURISTIC_CACHE_SIZE):
+        self.heuristic = heuristic
+        self.size = size
+        self.values = collections.OrderedDict() # state -> h(state), least recently used first
+        self.problem = None
+        self.hits = self.misses = 0
+
+    def __call__(self, state, problem=None):
+        if problem is not self.problem:
+            self.values.clear()
+            self.problem = problem
+        values = self.values
+        if state in values:
+            self.hits += 1
+            values.move_to_end(state)
+            return values[state]
+        self.misses += 1
+        value = values[state] = self.heuristic(state, problem)
+        if len(values) > self.size:
+            values.popitem(last=False)
+        return value
+
+def memoizeHeuristic(heuristic, size=HEURISTIC_CACHE_SIZE):
+    "Returns heuristic wrapped in a MemoizedHeuristic, unless it already is one."
+    if isinstance(heuristic, MemoizedHeuristic):
+        return heuristic
+    return MemoizedHeuristic(heuristic, size)
 
 def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
-    if problem.isGoalState(problem.getStartState()):
+    heuristic = problem._heuristicCache = memoizeHeuristic(heuristic)
+    def priority(node):
+        # f(n) = g(n) + h(n), ties broken in favour of the deeper node (higher g)
+        return (node.cost + heuristic(node.state, problem), -node.cost)
+    return graphSearch(problem, util.BucketQueue(), priority)
+
+
+class TranspositionTable:
+    """
+    Remembers the cheapest path cost (g) at which the memory-bounded searches
+    below have reached each state, and the state that path came from, so that
+    other paths to the same state that are no cheaper can be cut off.  At most
+    size states are kept; once the table is full new states are no longer
+    recorded, which only costs the search some duplicate work.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = {} # state -> (cost, parent state)
+
+    def isDuplicate(self, state, cost, parent=None):
+        """
+        Records that state was reached at cost from parent, and returns True if
+        it had already been reached from elsewhere at the same or lower cost.
+        Reaching a state again along the path that was recorded for it (as
+        RBFS does when it re-expands a subtree) is not a duplicate.
+        """
+        entry = self.entries.get(state)
+        if entry is not None:
+            if entry[0] < cost or (entry[0] == cost and entry[1] != parent):
+                return True
+            self.entries[state] = (cost, parent)
+        elif len(self.entries) < self.size:
+            self.entries[state] = (cost, parent)
+        return False
+
+    def __len__(self):
+        return len(self.entries)
+
+TRANSPOSITION_TABLE_SIZE = 100000
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, tableSize=TRANSPOSITION_TABLE_SIZE):
+    """
+    Iterative-deepening A*: repeated depth-first searches, each cut off at an
+    f = g + h bound that grows to the smallest f that exceeded the last one.
+    Only the current path is kept, plus a transposition table and heuristic
+    cache of at most tableSize states each (0 turns them off), so memory stays
+    bounded.  The largest number of nodes held at once is left in
+    problem._peakNodes.
+
+    The table is kept across iterations, and the next bound only counts
+    cut-off paths to states not yet reached as cheaply, so a search for an
+    unreachable goal stops once it has covered everything it can reach.
+    """
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    heuristic = problem._heuristicCache = memoizeHeuristic(heuristic, tableSize)
+    peak = 0
+    bound = heuristic(startState, problem)
+    inf = float('inf')
+    table = TranspositionTable(tableSize)
+    table.isDuplicate(startState, 0)
+    while bound != inf:
+        nextBound = inf
+        cutoffs = {} # state -> (g, f) of its cheapest cut-off path, while there is room
+        actions, onPath = [], set([startState])
+        stack = [(startState, 0, iter(problem.getSuccessors(startState)))]
+        while stack:
+            state, cost, successors = stack[-1]
+            for successor, action, stepCost in successors:
+                if successor in onPath:
+                    continue
+                g = cost + stepCost
+                f = g + heuristic(successor, problem)
+                if f > bound:
+                    nextBound = min(nextBound, f)
+                    if cutoffs is not None and g < cutoffs.get(successor, (inf,))[0]:
+                        if len(cutoffs) < tableSize or successor in cutoffs:
+                            cutoffs[successor] = (g, f)
+                        else:
+                            cutoffs = None
+                    continue
+                if problem.isGoalState(successor):
+                    problem._peakNodes = max(peak, len(stack) + len(table) + len(cutoffs or ()))
+                    return actions + [action]
+                if table.isDuplicate(successor, g, state):
+                    continue
+                onPath.add(successor)
+                actions.append(action)
+                stack.append((successor, g, iter(problem.getSuccessors(successor))))
+                peak = max(peak, len(stack) + len(table) + len(cutoffs or ()))
+                break
+            else:
+                stack.pop()
+                onPath.discard(state)
+                if stack:
+                    actions.pop()
+        if cutoffs is not None:
+            # A state cut off at g that this iteration expanded at g or less
+            # leads nowhere new; with none other left the goal is unreachable.
+            nextBound = min([f for state, (g, f) in cutoffs.items()
+                             if state not in table.entries or table.entries[state][0] > g] or [inf])
+        bound = nextBound
+    problem._peakNodes = peak
+    return []
+
+def recursiveBestFirstSearch(problem, heuristic=nullHeuristic, tableSize=TRANSPOSITION_TABLE_SIZE):
+    """
+    Recursive best-first search (Korf): best-first order in linear memory.  The
+    recursion explores the best child while its f stays below that of the
+    best alternative anywhere above it, and backs the best f of a subtree up
+    into its root when it gives up on it, so the subtree can be re-explored
+    later.  A transposition table of at most tableSize states (0 turns it off)
+    cuts off paths that reach a state no more cheaply than before, and as many
+    heuristic values are cached.  The largest number of nodes held at once is
+    left in problem._peakNodes.
+    """
+    startState = problem.getStartState()
+    heuristic = problem._heuristicCache = memoizeHeuristic(heuristic, tableSize)
+    table = TranspositionTable(tableSize)
+    table.isDuplicate(startState, 0)
+    onPath = set([startState])
+    held = [0, 0] # nodes held by the recursion now, and at most
+
+    def search(state, cost, f, fLimit):
+        "Returns (actions to a goal or None, backed-up f of state)."
+        if problem.isGoalState(state):
+            return [], f
+        children = []
+        for successor, action, stepCost in problem.getSuccessors(state):
+            g = cost + stepCost
+            if successor in onPath or table.isDuplicate(successor, g, state):
+                continue
+            children.append([max(g + heuristic(successor, problem), f), g, successor, action])
+        if not children:
+            return None, float('inf')
+        held[0] += len(children)
+        held[1] = max(held[1], held[0] + len(table))
+        try:
+            while True:
+                children.sort(key=lambda child: child[0])
+                best = children[0]
+                if best[0] > fLimit or best[0] == float('inf'):
+                    return None, best[0]
+                alternative = children[1][0] if len(children) > 1 else float('inf')
+                onPath.add(best[2])
+                result, best[0] = search(best[2], best[1], best[0], min(fLimit, alternative))
+                onPath.discard(best[2])
+                if result is not None:
+                    return [best[3]] + result, best[0]
+        finally:
+            held[0] -= len(children)
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 100000))
+    try:
+        actions, f = search(startState, 0, heuristic(startState, problem), float('inf'))
+    finally:
+        sys.setrecursionlimit(limit)
+    problem._peakNodes = held[1]
+    return actions if actions is not None else []
+
+
+class ReversedProblem:
+    """
+    A view of a single-goal search problem with its start and goal swapped, so
+    that a heuristic written for the forward problem (one that reads
+    problem.goal) estimates the distance back to the start instead.  Every
+    other attribute is looked up on the wrapped problem.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def joinPaths(forwardNode, backwardNode):
+    """
+    Returns the actions of a path that follows forwardNode's path to their
+    common state and then backwardNode's tree (built from the goal with
+    getPredecessors, so its actions already point towards the goal).
+    """
+    actions = forwardNode.path()
+    node = backwardNode
+    while node.parent is not None:
+        actions.append(node.action)
+        node = node.parent
+    return actions
+
+def checkBidirectional(problem):
+    if 'getGoalState' not in dir(problem) or 'getPredecessors' not in dir(problem):
+        raise Exception('Bidirectional search needs a problem with a single goal '
+                        '(getGoalState) and a predecessor function (getPredecessors).')
+
+def bidirectionalSearch(problem):
+    """
+    Breadth-first search from the start and from the goal at the same time.
+
+    The problem must have exactly one goal, returned by
+    problem.getGoalState(), and a problem.getPredecessors(state) that returns
+    (predecessor, action, stepCost) triples, where action leads from the
+    predecessor to state.  The smaller frontier is always grown by one whole
+    layer; once a layer touches the other search tree the shortest of the
+    connecting paths is returned, so like bfs the path has the fewest actions.
+    """
+    checkBidirectional(problem)
+    startState, goalState = problem.getStartState(), problem.getGoalState()
+    if problem.isGoalState(startState):
+        return []
+    forward, backward = {startState: Node(startState)}, {goalState: Node(goalState)}
+    forwardLayer, backwardLayer = [startState], [goalState]
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            forwardLayer, meeting = expandLayer(forwardLayer, forward, backward, problem.getSuccessors)
+        else:
+            backwardLayer, meeting = expandLayer(backwardLayer, backward, forward, problem.getPredecessors)
+        if meeting is not None:
+            return joinPaths(forward[meeting], backward[meeting])
+    return []
+
+def expandLayer(layer, reached, otherReached, expand):
+    """
+    Expands every state of one BFS layer, adding the new states to reached.
+    Returns the next layer and the state where the two searches join on the
+    shortest connecting path (None if they have not met yet).
+    """
+    nextLayer = []
+    meeting, meetingCost = None, None
+    for state in layer:
+        parent = reached[state]
+        for successor, action, stepCost in expand(state):
+            if successor in reached:
+                continue
+            reached[successor] = Node(successor, parent, action, parent.cost + 1)
+            nextLayer.append(successor)
+            if successor in otherReached:
+                cost = parent.cost + 1 + otherReached[successor].cost
+                if meeting is None or cost < meetingCost:
+                    meeting, meetingCost = successor, cost
+    return nextLayer, meeting
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    A* run from the start towards the goal and from the goal back towards the
+    start, always expanding the side whose best f value is lower.
+
+    The problem must support bidirectionalSearch (see above).  The backward
+    search evaluates the same heuristic on ReversedProblem(problem), so it must
+    be a heuristic that measures towards problem.goal, like
+    manhattanHeuristic.  Each time the trees touch, the cost of the joined path
+    is recorded; the search stops once the best such cost is no greater than
+    the lowest f value on either frontier, which with a consistent heuristic
+    guarantees the path is optimal.
+    """
+    checkBidirectional(problem)
+    startState, goalState = problem.getStartState(), problem.getGoalState()
+    if problem.isGoalState(startState):
+        return []
+    reverse = ReversedProblem(problem)
+    sides = [BidirectionalSide(startState, problem.getSuccessors, lambda state: heuristic(state, problem)),
+             BidirectionalSide(goalState, problem.getPredecessors, lambda state: heuristic(state, reverse))]
+    best, meeting = None, None
+    while not sides[0].frontier.isEmpty() and not sides[1].frontier.isEmpty():
+        bounds = [side.frontier.heap[0][0] for side in sides]
+        if best is not None and best <= max(bounds):
+            break
+        side, other = (sides[0], sides[1]) if bounds[0] <= bounds[1] else (sides[1], sides[0])
+        for state in side.expand(other.closed, best):
+            if state in other.reached:
+                cost = side.reached[state].cost + other.reached[state].cost
+                if best is None or cost < best:
+                    best, meeting = cost, state
+    if meeting is None:
+        return []
+    return joinPaths(sides[0].reached[meeting], sides[1].reached[meeting])
+
+class BidirectionalSide:
+    "One direction of bidirectionalAStarSearch: an A* frontier over expandFunction."
+    def __init__(self, root, expandFunction, heuristic):
+        self.expandFunction = expandFunction
+        self.heuristic = heuristic
+        self.reached = {root: Node(root)} # state -> cheapest node found so far
+        self.hValues = {root: heuristic(root)}
+        self.closed = set()
+        self.frontier = util.IndexedPriorityQueue()
+        self.frontier.push(root, self.hValues[root])
+
+    def expand(self, otherClosed, best):
+        """
+        Expands the best frontier state and returns the states whose g improved.
+        A state the other side has already expanded is not expanded again (its
+        meeting cost was recorded when it was reached), and successors whose f
+        cannot beat the best joined path so far are not queued.
+        """
+        node = self.reached[self.frontier.pop()]
+        self.closed.add(node.state)
+        if node.state in otherClosed:
+            return []
+        improved = []
+        for successor, action, stepCost in self.expandFunction(node.state):
+            if successor in self.closed:
+                continue
+            cost = node.cost + stepCost
+            if successor in self.reached and self.reached[successor].cost <= cost:
+                continue
+            self.reached[successor] = Node(successor, node, action, cost)
+            improved.append(successor)
+            if successor not in self.hValues:
+                self.hValues[successor] = self.heuristic(successor)
+            if best is None or cost + self.hValues[successor] < best:
+                self.frontier.update(successor, cost + self.hValues[successor])
+        return improved
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, weight=3.0, deadline=1.0, weightStep=0.5):
+    """
+    Anytime repairing A* (ARA*, Likhachev et al.).  A first plan comes quickly
+    from A* with the heuristic inflated by weight; it is then improved by
+    searches with smaller and smaller weights, each reusing the work of the
+    last, until the plan is proven optimal or deadline seconds have passed.
+    The best plan found by then is returned.  The search only runs past the
+    deadline while it has no plan at all.
+
+    Each new plan, or tighter bound on the current one, is printed with its
+    cost, how many times the optimal cost it can be at most, and the time it
+    took to find.
+    """
+    startTime = time.time()
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    heuristic = problem._heuristicCache = memoizeHeuristic(heuristic)
+    def key(state):
+        cost = nodes[state].cost
+        return (cost + weight * heuristic(state, problem), -cost)
+
+    nodes = {startState: Node(startState)} # state -> cheapest node found so far
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(startState, key(startState))
+    closed, inconsistent = set(), set()
+    best, reported = None, (None, None) # cheapest goal node found; the last plan and bound printed
+    while True:
+        # Expand states until none left in the frontier could lead to a
+        # cheaper goal, given the current weight.
+        while not frontier.isEmpty() and (best is None or best.cost > frontier.heap[0][0][0]):
+            if best is not None and time.time() - startTime > deadline:
+                break
+            state = frontier.pop()
+            closed.add(state)
+            node = nodes[state]
+            for successor, action, stepCost in problem.getSuccessors(state):
+                cost = node.cost + stepCost
+                if successor in nodes and nodes[successor].cost <= cost:
+                    continue
+                child = nodes[successor] = Node(successor, node, action, cost)
+                if problem.isGoalState(successor):
+                    if best is None or cost < best.cost:
+                        best = child
+                elif successor in closed:
+                    inconsistent.add(successor) # re-expanded with the next weight
+                else:
+                    frontier.update(successor, key(successor))
+        if best is None:
+            return []
+
+        waiting = set(frontier.latest) | inconsistent
+        lowest = min([nodes[state].cost + heuristic(state, problem) for state in waiting] or [best.cost])
+        bound = min(weight, best.cost / lowest) if lowest > 0 else weight
+        elapsed = time.time() - startTime
+        bound = max(bound, 1.0)
+        if (best, bound) != reported:
+            print('[ARA*] path cost %g, at most %.3f times optimal, after %.3f seconds' % (best.cost, bound, elapsed))
+            reported = (best, bound)
+        if bound <= 1 or elapsed > deadline:
+            return best.path()
+
+        weight = max(1.0, weight - weightStep)
+        frontier = util.IndexedPriorityQueue()
+        for state in waiting:
+            frontier.push(state, key(state))
+        closed, inconsistent = set(), set()
+
+class DStarLite:
+    """
+    D* Lite (Koenig and Likhachev): plans from the start of a single-goal
+    problem to its goal, and keeps its search between plans so that replanning
+    after a few step costs change, or after the agent moves, only expands the
+    states whose distance to the goal changed.
+
+    The search runs backward from the goal; g[state] is the cost from state to
+    the goal as last computed and rhs[state] the one-step lookahead estimate
+    from its successors.  States where the two disagree are queued by
+    (min(g, rhs) + h + km, min(g, rhs)), where h estimates the distance from
+    the current start and km makes up for the start having moved since the
+    older keys in the queue were computed.
+
+    The problem must provide getGoalState() and getPredecessors(state), and
+    the step cost of a move must be the cost of entering the state it reaches,
+    as in PositionSearchProblem.  Changed costs are picked up from the
+    problem's takeChangedCells(), which lists the states whose cost of
+    entering changed (see PositionSearchProblem.setCellCost).
+
+    So that the problem's expansion count reflects the search's work, a
+    state's predecessors are asked for when it is popped from the frontier or
+    its cost changes, and its successors once, until a cost change drops
+    them: when a state's g drops, its predecessors' rhs is lowered straight
+    from their step costs, and only when it rises do they look at their
+    successors again.
+    """
+
+    def __init__(self, problem, heuristic=nullHeuristic):
+        self.problem = problem
+        self.heuristic = heuristic
+        self.start = self.lastStart = problem.getStartState()
+        self.goal = problem.getGoalState()
+        self.view = ReversedProblem(problem) # its goal is the start, for h
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.successors = {} # state -> problem.getSuccessors(state), dropped when its step costs change
+        self.queued = {} # state -> its key in the frontier; other frontier entries are stale
+        self.frontier = util.IndexedPriorityQueue()
+        self.queue(self.goal)
+
+    def estimate(self, fromState, toState):
+        "The heuristic's estimate of the cost between two states."
+        self.view.goal = fromState
+        return self.heuristic(toState, self.view)
+
+    def calculateKey(self, state):
+        cost = min(self.g.get(state, float('inf')), self.rhs.get(state, float('inf')))
+        return (cost + self.estimate(self.start, state) + self.km, cost)
+
+    def queue(self, state):
+        key = self.queued[state] = self.calculateKey(state)
+        self.frontier.push(state, key)
+
+    def topKey(self):
+        "Returns the lowest key in the frontier, dropping stale entries."
+        frontier = self.frontier
+        while not frontier.isEmpty():
+            key, _, state = frontier.heap[0]
+            if self.queued.get(state) == key:
+                return key
+            frontier.pop()
+        return (float('inf'), float('inf'))
+
+    def getSuccessors(self, state):
+        "Returns the problem's successors of state, asking the problem only the first time."
+        if state not in self.successors:
+            self.successors[state] = self.problem.getSuccessors(state)
+        return self.successors[state]
+
+    def updateState(self, state):
+        "Recomputes rhs[state] and (re)queues state if it is inconsistent."
+        if state != self.goal:
+            g = self.g
+            self.rhs[state] = min([cost + g.get(successor, float('inf'))
+                                   for successor, action, cost in self.getSuccessors(state)]
+                                  or [float('inf')])
+        self.queued.pop(state, None)
+        if self.g.get(state, float('inf')) != self.rhs.get(state, float('inf')):
+            self.queue(state)
+
+    def computeShortestPath(self):
+        g, rhs, problem = self.g, self.rhs, self.problem
+        inf = float('inf')
+        while self.topKey() < self.calculateKey(self.start) or \
+              rhs.get(self.start, inf) != g.get(self.start, inf):
+            oldKey = self.topKey()
+            state = self.frontier.pop()
+            del self.queued[state]
+            newKey = self.calculateKey(state)
+            if oldKey < newKey:
+                self.queue(state)
+            elif g.get(state, inf) > rhs.get(state, inf):
+                g[state] = rhs[state]
+                for predecessor, action, cost in problem.getPredecessors(state):
+                    if predecessor != self.goal and cost + g[state] < rhs.get(predecessor, inf):
+                        rhs[predecessor] = cost + g[state]
+                        self.updateState(predecessor)
+            else:
+                oldG, g[state] = g.get(state, inf), inf
+                self.updateState(state)
+                for predecessor, action, cost in problem.getPredecessors(state):
+                    # Only predecessors whose best successor was state lose their rhs.
+                    if rhs.get(predecessor, inf) == cost + oldG:
+                        self.updateState(predecessor)
+
+    def moveTo(self, state):
+        "Tells the planner that the agent now stands at state."
+        self.start = state
+
+    def plan(self):
+        """
+        Repairs the search for any costs that changed since the last plan, and
+        returns the actions of a cheapest path from the start to the goal ([]
+        if there is none).
+        """
+        problem = self.problem
+        changed = problem.takeChangedCells() if 'takeChangedCells' in dir(problem) else ()
+        if changed:
+            self.km += self.estimate(self.lastStart, self.start)
+            self.lastStart = self.start
+            for state in changed:
+                for predecessor, action, cost in problem.getPredecessors(state):
+                    self.successors.pop(predecessor, None)
+                    self.updateState(predecessor)
+        self.computeShortestPath()
+
+        g, inf = self.g, float('inf')
+        if g.get(self.start, inf) == inf:
+            return []
+        actions, state, visited = [], self.start, set([self.start])
+        while state != self.goal:
+            cost, action, state = min([(cost + g.get(successor, inf), action, successor)
+                                       for successor, action, cost in self.getSuccessors(state)
+                                       if successor not in visited])
+            visited.add(state)
+            actions.append(action)
+        return actions
+
+def dStarLiteSearch(problem, heuristic=nullHeuristic):
+    """
+    Plans once with DStarLite.  To replan after costs change, keep the
+    DStarLite object and call its plan() method again.
+    """
+    return DStarLite(problem, heuristic).plan()
+
+def jumpPointSearch(problem):
+    """
+    Jump point search for shortest paths on a 4-connected grid where every move
+    costs 1, such as a PositionSearchProblem with the default cost function.
+
+    The problem must provide getStartState(), getGoalState() and getWalls(),
+    the layout's wall Grid.  Instead of generating every neighbour, the search
+    jumps in straight lines and only stops at the goal and at jump points:
+    cells where an optimal path may have to turn.  Horizontal moves are
+    preferred, so a horizontal jump stops wherever a vertical scan from it
+    finds a jump point, and a vertical jump stops where a wall ends beside it.
+    The jump points are searched with A* and the Manhattan distance, so the
+    plan has the same (optimal) cost as ucs or astar would find.
+    """
+    walls, goal = problem.getWalls(), problem.getGoalState()
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+
+    def isOpen(x, y):
+        return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+
+    def jump(x, y, dx, dy):
+        "Returns the first jump point from (x,y) in direction (dx,dy), or None."
+        while True:
+            x, y = x + dx, y + dy
+            if not isOpen(x, y):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if dx != 0:
+                if jump(x, y, 0, 1) is not None or jump(x, y, 0, -1) is not None:
+                    return (x, y)
+            elif (isOpen(x - 1, y) and not isOpen(x - 1, y - dy)) or \
+                 (isOpen(x + 1, y) and not isOpen(x + 1, y - dy)):
+                return (x, y)
+
+    def directions(cell, arrival):
+        "Returns the directions worth jumping in after arriving at cell."
+        if arrival is None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        dx, dy = arrival
+        if dx != 0:
+            return [(dx, 0), (0, 1), (0, -1)]
+        x, y = cell
+        result = [(0, dy)]
+        for side in (-1, 1):
+            if isOpen(x + side, y) and not isOpen(x + side, y - dy):
+                result.append((side, 0))
+        return result
+
+    from game import Actions
+    root = Node(startState)
+    nodes = {startState: root}  # cell -> cheapest node found so far
+    arrivals = {startState: None} # cell -> direction of that node's last jump
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(startState, util.manhattanDistance(startState, goal))
+    closed = set()
+    while not frontier.isEmpty():
+        cell = frontier.pop()
+        node = nodes[cell]
+        if problem.isGoalState(cell):
+            actions = []
+            for direction, steps in node.path():
+                actions += [direction] * steps
+            return actions
+        closed.add(cell)
+        if '_expanded' in dir(problem): problem._expanded += 1
+        for dx, dy in directions(cell, arrivals[cell]):
+            jumpPoint = jump(cell[0], cell[1], dx, dy)
+            if jumpPoint is None or jumpPoint in closed:
+                continue
+            steps = abs(jumpPoint[0] - cell[0]) + abs(jumpPoint[1] - cell[1])
+            cost = node.cost + steps
+            if jumpPoint in nodes and nodes[jumpPoint].cost <= cost:
+                continue
+            nodes[jumpPoint] = Node(jumpPoint, node, (Actions.vectorToDirection((dx, dy)), steps), cost)
+            arrivals[jumpPoint] = (dx, dy)
+            frontier.update(jumpPoint, cost + util.manhattanDistance(jumpPoint, goal))
+    return []
+
+HPA_CLUSTER_SIZE = 10   # cells along each side of a cluster
+HPA_WIDE_ENTRANCE = 6   # entrances at least this wide get a transition at each end
+HPA_GRAPH_CACHE_SIZE = 16 # most recently used AbstractGraphs kept
+HPA_GRAPH_CACHE = collections.OrderedDict() # (walls digest, clusterSize) -> AbstractGraph
+
+class AbstractGraph:
+    """
+    The abstraction used by hierarchicalSearch (HPA*, Botea et al.) for a
+    4-connected grid where every move costs 1.  The walls are cut into square
+    clusters of clusterSize cells.  Along each border between two clusters,
+    every maximal run of cells open on both sides is an entrance, crossed by
+    one transition in its middle, or by one at each end if it is at least
+    HPA_WIDE_ENTRANCE cells wide.  The cells on either side of a transition
+    are the graph's nodes: they are joined to each other by an edge of cost 1,
+    and to the other nodes of their cluster by edges costing their distance
+    within the cluster, found by a BFS that does not leave it.
+    """
+
+    def __init__(self, walls, clusterSize=HPA_CLUSTER_SIZE):
+        self.walls, self.clusterSize = walls, clusterSize
+        self.edges = collections.defaultdict(dict)    # node -> {node: cost}
+        self.nodes = collections.defaultdict(set)     # cluster -> its nodes
+        width, height = walls.width, walls.height
+        for border in range(clusterSize, width, clusterSize):
+            for low in range(0, height, clusterSize):
+                self._addEntrances([((border - 1, y), (border, y)) for y in range(low, min(low + clusterSize, height))])
+        for border in range(clusterSize, height, clusterSize):
+            for low in range(0, width, clusterSize):
+                self._addEntrances([((x, border - 1), (x, border)) for x in range(low, min(low + clusterSize, width))])
+        for cluster, nodes in self.nodes.items():
+            for node in nodes:
+                distances = self.localDistances(node)
+                for other in nodes:
+                    if other != node and other in distances:
+                        self.edges[node][other] = distances[other]
+
+    def _addEntrances(self, pairs):
+        "Adds the transitions across one border segment, given as pairs of facing cells."
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self.isOpen(pair[0]) and self.isOpen(pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                crossings = [run[0], run[-1]] if len(run) >= HPA_WIDE_ENTRANCE else [run[len(run) // 2]]
+                for inside, outside in crossings:
+                    self.nodes[self.cluster(inside)].add(inside)
+                    self.nodes[self.cluster(outside)].add(outside)
+                    self.edges[inside][outside] = self.edges[outside][inside] = 1
+            run = []
+
+    def isOpen(self, cell):
+        x, y = cell
+        return 0 <= x < self.walls.width and 0 <= y < self.walls.height and not self.walls[x][y]
+
+    def cluster(self, cell):
+        return (cell[0] // self.clusterSize, cell[1] // self.clusterSize)
+
+    def localSearch(self, start, target=None):
+        """
+        BFS from start that stays inside its cluster.  Returns a dictionary
+        from every cell reached to (distance, previous cell); it stops early
+        once target is reached.
+        """
+        cluster = self.cluster(start)
+        reached = {start: (0, None)}
+        layer = [start]
+        while layer and target not in reached:
+            nextLayer = []
+            for cell in layer:
+                distance = reached[cell][0] + 1
+                for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+                    neighbor = (cell[0] + dx, cell[1] + dy)
+                    if neighbor not in reached and self.isOpen(neighbor) and self.cluster(neighbor) == cluster:
+                        reached[neighbor] = (distance, cell)
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+        return reached
+
+    def localDistances(self, start):
+        "Returns the distance from start to every cell of its cluster it can reach without leaving it."
+        return dict((cell, entry[0]) for cell, entry in self.localSearch(start).items())
+
+    def refine(self, start, end):
+        "Returns the cells after start on a shortest path to end, an edge of the graph or a query."
+        if self.cluster(start) != self.cluster(end):
+            return [end] # a transition
+        reached = self.localSearch(start, end)
+        cells = []
+        while end != start:
+            cells.append(end)
+            end = reached[end][1]
+        cells.reverse()
+        return cells
+
+def getAbstractGraph(walls, clusterSize=HPA_CLUSTER_SIZE):
+    """
+    Returns the AbstractGraph for a walls Grid, shared between all problems on
+    the same walls (see util.wallsDigest).  Only the HPA_GRAPH_CACHE_SIZE
+    most recently used graphs are kept.
+    """
+    key = (util.wallsDigest(walls), clusterSize)
+    if key in HPA_GRAPH_CACHE:
+        HPA_GRAPH_CACHE.move_to_end(key)
+    else:
+        HPA_GRAPH_CACHE[key] = AbstractGraph(walls, clusterSize)
+        if len(HPA_GRAPH_CACHE) > HPA_GRAPH_CACHE_SIZE:
+            HPA_GRAPH_CACHE.popitem(last=False)
+    return HPA_GRAPH_CACHE[key]
+
+def hierarchicalSearch(problem, clusterSize=HPA_CLUSTER_SIZE):
+    """
+    Hierarchical path-finding A* (HPA*) for the same problems as
+    jumpPointSearch: 4-connected grids where every move costs 1, with
+    getStartState(), getGoalState() and getWalls().
+
+    The start and goal are joined to the nodes of their clusters (and to each
+    other, if they share one) of the layout's AbstractGraph, which is built
+    once per walls and cluster size and reused by every later query.  A* with
+    the Manhattan distance finds a path through the graph, and each of its
+    edges is refined into moves by a BFS inside one cluster.  The plan is
+    usually within a few percent of optimal, but not always optimal: the
+    graph only crosses each entrance at one or two places.  Goals no more
+    than clusterSize steps away as the crow flies are left to jumpPointSearch
+    instead, as the detour through an entrance would cost those the most.
+    Expanded counts abstract nodes.
+    """
+    walls, goal = problem.getWalls(), problem.getGoalState()
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
         return []
-    #queue: ((x,y),[path])
-    queue = MyPriorityQueueWithFunction(problem, calculateHeuristic)
-    
-    param = (problem.getStartState(), [])
-    print(type(problem))
-    queue.push(param, heuristic)
-    visited = []
-    route = []
-    while not queue.isEmpty():
-        position,route = queue.pop()
-        if problem.isGoalState(position):
-            return route
-        if position not in visited:
-            visited.append(position)
-            successors = problem.getSuccessors(position)
-            for successor in list(successors):
-                if successor[0] not in visited:
-                    updatedRoute = route + [successor[1]]
-                    param = (successor[0], updatedRoute)
-                    queue.push(param, heuristic)
+    if util.manhattanDistance(startState, goal) <= clusterSize:
+        return jumpPointSearch(problem) # short queries are cheap, and exact, without the graph
+    from game import Actions
+    graph = getAbstractGraph(walls, clusterSize)
+
+    # Temporary edges for this query, leaving the shared graph alone.
+    startEdges = {}
+    startDistances = graph.localDistances(startState)
+    for node in graph.nodes[graph.cluster(startState)] | set([goal]):
+        if node in startDistances:
+            startEdges[node] = startDistances[node]
+    goalEdges = {} # node -> cost from it to the goal
+    goalDistances = graph.localDistances(goal)
+    for node in graph.nodes[graph.cluster(goal)]:
+        if node in goalDistances:
+            goalEdges[node] = goalDistances[node]
+
+    root = Node(startState)
+    nodes = {startState: root} # cell -> cheapest node found so far
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(startState, util.manhattanDistance(startState, goal))
+    closed = set()
+    while not frontier.isEmpty():
+        cell = frontier.pop()
+        node = nodes[cell]
+        if cell == goal:
+            cells, actions = [startState], []
+            for nextCell in node.path():
+                cells += graph.refine(cells[-1], nextCell)
+            for (x, y), (nextX, nextY) in zip(cells, cells[1:]):
+                actions.append(Actions.vectorToDirection((nextX - x, nextY - y)))
+            return actions
+        closed.add(cell)
+        if '_expanded' in dir(problem): problem._expanded += 1
+        edges = graph.edges.get(cell, {})
+        if cell == startState or cell in goalEdges:
+            edges = dict(edges)
+            if cell == startState:
+                edges.update(startEdges)
+            if cell in goalEdges:
+                edges[goal] = goalEdges[cell]
+        for successor, stepCost in edges.items():
+            successorCost = node.cost + stepCost
+            if successor in closed or (successor in nodes and nodes[successor].cost <= successorCost):
+                continue
+            nodes[successor] = Node(successor, node, successor, successorCost)
+            frontier.update(successor, successorCost + util.manhattanDistance(successor, goal))
     return []
-    
-    util.raiseNotDefined()
+
+HDA_BATCH_SIZE = 64 # states a worker expands between checking its messages
+HDA_POLL_INTERVAL = 1 # seconds hashDistributedAStarSearch waits for a message before checking on the workers
+
+def hashDistributedAStarSearch(problem, heuristic=nullHeuristic, workers=None, batchSize=HDA_BATCH_SIZE):
+    """
+    Hash-distributed A* (HDA*, Kishimoto et al.): the search is split between
+    worker processes, one per core unless workers says otherwise, and every
+    state belongs to the worker picked by its hash.  Each worker runs A* on
+    the states it owns; successors owned by other workers are sent to them in
+    batches.
+
+    A worker that pops a goal reports its cost, and the cheapest one reported
+    so far bounds every worker's search.  The search stops once a snapshot of
+    all the workers, taken twice in a row with the same message counts, shows
+    none of them with a state under the bound and no states still in flight;
+    the bound is then the optimal cost.  States may be expanded more than once
+    when a cheaper path to them arrives late.
+
+    The workers are forked, so they share the problem and heuristic as they
+    are when the search starts, and states must be picklable and hash the
+    same in every worker.  Where processes cannot be forked, or with a single
+    worker, this is plain aStarSearch.  Nodes expanded by the workers are
+    added up in problem._expanded, but statistics kept inside the problem
+    itself (like searchWithStats') stay in the workers.  If a worker fails,
+    the others are stopped and the search raises an Exception with the
+    worker's traceback:
+
+    >>> import layout, pacman, searchAgents
+    >>> gameState = pacman.GameState()
+    >>> gameState.initialize(layout.getLayout('tinyMaze'), 0)
+    >>> problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+    >>> def failingHeuristic(state, problem):
+    ...     raise ValueError('no estimate')
+    >>> hashDistributedAStarSearch(problem, failingHeuristic, workers=2) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+      ...
+    Exception: hashDistributedAStarSearch worker ... failed:
+    Traceback (most recent call last):
+    ...
+    ValueError: no estimate
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return aStarSearch(problem, heuristic)
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+
+    context = multiprocessing.get_context('fork')
+    inboxes = [context.Queue() for _ in range(workers)]
+    reports = context.Queue()
+    processes = [context.Process(target=hdaWorker, args=(problem, heuristic, index, inboxes, reports, batchSize))
+                 for index in range(workers)]
+    for process in processes:
+        process.daemon = True
+        process.start()
+    finished = set()
+
+    def nextReport():
+        "Returns the next message from the workers, raising if one of them has failed."
+        while True:
+            try:
+                message = reports.get(timeout=HDA_POLL_INTERVAL)
+            except queue.Empty:
+                for index, process in enumerate(processes):
+                    if index not in finished and not process.is_alive():
+                        raise Exception('hashDistributedAStarSearch worker %d exited with code %s' % (index, process.exitcode))
+                continue
+            if message[0] == 'error':
+                raise Exception('hashDistributedAStarSearch worker %d failed:\n%s' % message[1:])
+            return message
+
+    try:
+        # States travel pickled, so one that cannot be pickled fails here
+        # rather than being dropped by the queue's feeder thread.
+        inboxes[hash(startState) % workers].put(('states', pickle.dumps([(startState, 0, None, None)])))
+        bound, goal = float('inf'), None
+        wave, replies, previous = 0, {}, None
+        for inbox in inboxes:
+            inbox.put(('probe', wave))
+        while True:
+            message = nextReport()
+            if message[0] == 'goal':
+                cost, state = message[2:]
+                if cost < bound:
+                    bound, goal = cost, state
+                    for inbox in inboxes:
+                        inbox.put(('bound', cost))
+            elif message[0] == 'probe' and message[2] == wave:
+                replies[message[1]] = message[3:]
+                if len(replies) < workers:
+                    continue
+                # Every worker answered: (idle, states sent, states received).
+                snapshot = tuple(replies[index] for index in range(workers))
+                quiet = all(idle for idle, sent, received in snapshot) and \
+                        1 + sum(sent for idle, sent, received in snapshot) == sum(received for idle, sent, received in snapshot)
+                if quiet and snapshot == previous:
+                    break
+                previous = snapshot if quiet else None
+                wave, replies = wave + 1, {}
+                for inbox in inboxes:
+                    inbox.put(('probe', wave))
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        parents, expanded = {}, 0
+        while len(finished) < workers:
+            message = nextReport()
+            if message[0] == 'done':
+                parents.update(message[2])
+                expanded += message[3]
+                finished.add(message[1])
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+    if '_expanded' in dir(problem): problem._expanded += expanded
+    if goal is None:
+        return []
+    actions, state = [], goal
+    while parents[state][0] is not None:
+        state, action = parents[state]
+        actions.append(action)
+    actions.reverse()
+    return actions
+
+def hdaWorker(problem, heuristic, index, inboxes, reports, batchSize):
+    """
+    The search run by one hashDistributedAStarSearch worker.  Messages to the
+    worker are ('states', [(state, cost, parent, action), ...]), ('bound',
+    cost), ('probe', wave) and ('stop',), with the states pickled; it answers
+    probes with whether it is idle and how many states it has sent and
+    received, stop with the parent pointers of its states and how many it
+    expanded, and anything it raises with ('error', index, traceback).
+    """
+    try:
+        inf = float('inf')
+        heuristic = memoizeHeuristic(heuristic)
+        inbox, owners = inboxes[index], len(inboxes)
+        outboxes = [[] for _ in inboxes]
+        costs, parents, frontier = {}, {}, [] # frontier holds (f, -cost, tie, state)
+        bound, sent, received, expanded, tie = inf, 0, 0, 0, 0
+
+        while True:
+            idle = not frontier or frontier[0][0] >= bound
+            messages = [inbox.get()] if idle else []
+            try:
+                while True:
+                    messages.append(inbox.get_nowait())
+            except queue.Empty:
+                pass
+            incoming, probe = [], None
+            for message in messages:
+                if message[0] == 'states':
+                    states = pickle.loads(message[1])
+                    incoming.extend(states)
+                    received += len(states)
+                elif message[0] == 'bound':
+                    bound = min(bound, message[1])
+                elif message[0] == 'probe':
+                    probe = message[1]
+                else:
+                    for outbox in inboxes:
+                        outbox.cancel_join_thread() # nobody reads them any more
+                    reports.put(('done', index, parents, expanded))
+                    return
+
+            # Expand up to batchSize of this worker's states below the bound,
+            # keeping successors it owns and batching up the others.
+            budget = batchSize
+            while True:
+                for state, cost, parent, action in incoming:
+                    if cost < costs.get(state, inf):
+                        costs[state], parents[state] = cost, (parent, action)
+                        f = cost + heuristic(state, problem)
+                        if f < bound:
+                            heapq.heappush(frontier, (f, -cost, tie, state))
+                            tie += 1
+                incoming = []
+                if probe is not None:
+                    idle = not frontier or frontier[0][0] >= bound
+                    reports.put(('probe', index, probe, idle, sent, received))
+                    probe = None
+                if budget == 0 or not frontier or frontier[0][0] >= bound:
+                    break
+                budget -= 1
+                f, cost, _, state = heapq.heappop(frontier)
+                cost = -cost
+                if cost > costs[state]:
+                    continue
+                if problem.isGoalState(state):
+                    bound = cost
+                    reports.put(('goal', index, cost, state))
+                    continue
+                expanded += 1
+                for successor, action, stepCost in problem.getSuccessors(state):
+                    owner = hash(successor) % owners
+                    entry = (successor, cost + stepCost, state, action)
+                    if owner == index:
+                        incoming.append(entry)
+                    else:
+                        outboxes[owner].append(entry)
+            for owner, outbox in enumerate(outboxes):
+                if outbox:
+                    inboxes[owner].put(('states', pickle.dumps(outbox)))
+                    sent += len(outbox)
+                    outboxes[owner] = []
+    except Exception:
+        reports.put(('error', index, traceback.format_exc().rstrip()))
+
+EXTERNAL_MEMORY_BUDGET = 256 << 20 # bytes of frontier kept in memory by externalMemorySearch
+
+def externalMemorySearch(problem, heuristic=nullHeuristic, memoryBudget=EXTERNAL_MEMORY_BUDGET, directory=None):
+    """
+    A* (uniform cost search with the null heuristic) for problems whose
+    frontier and closed set do not fit in memory.  The frontier is a
+    util.SpillingPriorityQueue that keeps about memoryBudget bytes of entries
+    in memory and spills sorted runs to temporary files in directory.  The
+    closed set is a util.DiskHashSet, a memory-mapped hash table of packed
+    states.  Parent pointers are appended to a temporary file as fixed-size
+    records, so no search tree is kept in memory either.
+
+    States are packed with problem.packState(state), a short byte string,
+    if the problem has one, and pickled otherwise.  With no update() on the
+    frontier, a state reached again more cheaply is queued a second time and
+    the costlier entry is skipped when it comes up.
+    """
+    pack = getattr(problem, 'packState', None) or (lambda state: pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+    record = struct.Struct('<qi') # parent record number (-1 for the root), action number
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+
+    frontier = util.SpillingPriorityQueue(memoryBudget, directory)
+    closed = util.DiskHashSet(directory=directory)
+    records = tempfile.TemporaryFile(dir=directory)
+    actions, actionNumbers = [], {} # the few distinct actions, numbered for the records
+    try:
+        records.write(record.pack(-1, -1))
+        frontier.push((startState, 0, 0), (heuristic(startState, problem), 0))
+        count = 1
+        while not frontier.isEmpty():
+            state, cost, number = frontier.pop()
+            if problem.isGoalState(state):
+                records.flush()
+                path = []
+                while True:
+                    records.seek(number * record.size)
+                    number, action = record.unpack(records.read(record.size))
+                    if number < 0:
+                        break
+                    path.append(actions[action])
+                path.reverse()
+                return path
+            if not closed.add(pack(state)):
+                continue
+            for successor, action, stepCost in problem.getSuccessors(state):
+                if pack(successor) in closed:
+                    continue
+                if action not in actionNumbers:
+                    actionNumbers[action] = len(actions)
+                    actions.append(action)
+                records.write(record.pack(number, actionNumbers[action]))
+                successorCost = cost + stepCost
+                frontier.push((successor, successorCost, count),
+                              (successorCost + heuristic(successor, problem), -successorCost))
+                count += 1
+        return []
+    finally:
+        records.close()
+        closed.close()
+
+def externalUniformCostSearch(problem, memoryBudget=EXTERNAL_MEMORY_BUDGET, directory=None):
+    "Uniform cost search with externalMemorySearch."
+    return externalMemorySearch(problem, nullHeuristic, memoryBudget, directory)
+
+class SearchStats:
+    """
+    Measurements of one run of a search function, collected by searchWithStats.
+    """
+
+    def __init__(self):
+        self.expanded = 0           # calls to getSuccessors (and getPredecessors)
+        self.generated = 0          # successors those calls returned
+        self.duplicates = 0         # successors whose state had been generated before
+        self.peakFrontier = 0       # most states generated but not yet expanded at once
+        self.heuristicCalls = 0
+        self.heuristicCacheHits = 0 # heuristic values reused by a MemoizedHeuristic
+        self.heuristicTime = 0.0    # seconds spent in the heuristic
+        self.successorTime = 0.0    # seconds spent in getSuccessors (and getPredecessors)
+        self.searchTime = 0.0       # seconds spent in the whole search
+        self.depth = 0              # number of actions in the plan found
+
+    def branchingFactor(self):
+        """
+        The effective branching factor b*: the branching factor a uniform tree
+        of the plan's depth would need to hold as many nodes as were generated,
+        i.e. the b solving generated + 1 = 1 + b + b^2 + ... + b^depth.
+        """
+        if self.depth == 0 or self.generated == 0:
+            return 0.0
+        target = self.generated + 1
+        def treeSize(b):
+            size, level = 1.0, 1.0
+            for _ in range(self.depth):
+                level *= b
+                size += level
+                if size >= target:
+                    break
+            return size
+        low, high = 0.0, float(self.generated)
+        for _ in range(100):
+            b = (low + high) / 2
+            if treeSize(b) < target:
+                low = b
+            else:
+                high = b
+        return low
+
+    def asDict(self):
+        stats = dict(self.__dict__)
+        stats['branchingFactor'] = self.branchingFactor()
+        return stats
+
+class InstrumentedProblem:
+    """
+    Wraps a search problem for searchWithStats, counting and timing the calls
+    a search makes to getSuccessors (and getPredecessors).  Every other
+    attribute, including ones the search assigns, belongs to the wrapped
+    problem.
+    """
+
+    def __init__(self, problem, stats):
+        self.__dict__.update(problem=problem, stats=stats, seen=set([problem.getStartState()]), expandedStates=set())
+
+    def getSuccessors(self, state):
+        return self.record(state, self.problem.getSuccessors)
+
+    def getPredecessors(self, state):
+        return self.record(state, self.problem.getPredecessors)
+
+    def record(self, state, expand):
+        start = time.perf_counter()
+        successors = expand(state)
+        stats = self.stats
+        stats.successorTime += time.perf_counter() - start
+        stats.expanded += 1
+        stats.generated += len(successors)
+        for successor in successors:
+            if successor[0] in self.seen:
+                stats.duplicates += 1
+            else:
+                self.seen.add(successor[0])
+        self.expandedStates.add(state)
+        stats.peakFrontier = max(stats.peakFrontier, len(self.seen) - len(self.expandedStates))
+        return successors
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.problem, name, value)
+
+    def __dir__(self):
+        return dir(self.problem)
+
+def searchWithStats(searchFunction, problem, heuristic=None):
+    """
+    Runs searchFunction on problem, and returns the list of actions it found
+    together with a SearchStats for the run.  A search that takes a heuristic
+    should be given it here, not have it bound in already, so that the
+    heuristic's calls can be counted and timed as well.
+
+    Searches that never call getSuccessors (such as jps and hpastar, which
+    read the walls directly) get their expanded count from the nodes they add
+    to problem._expanded themselves; their other counts stay 0.
+    """
+    stats = SearchStats()
+    instrumented = InstrumentedProblem(problem, stats)
+    expandedBefore = problem._expanded if '_expanded' in dir(problem) else 0
+    start = time.perf_counter()
+    if heuristic is None:
+        actions = searchFunction(instrumented)
+    else:
+        def timedHeuristic(state, problem):
+            stats.heuristicCalls += 1
+            begin = time.perf_counter()
+            value = heuristic(state, problem)
+            stats.heuristicTime += time.perf_counter() - begin
+            return value
+        actions = searchFunction(instrumented, heuristic=timedHeuristic)
+    stats.searchTime = time.perf_counter() - start
+    stats.depth = len(actions)
+    if stats.expanded == 0 and '_expanded' in dir(problem):
+        stats.expanded = problem._expanded - expandedBefore
+    if '_heuristicCache' in dir(problem):
+        stats.heuristicCacheHits = problem._heuristicCache.hits
+    return actions, stats
 
 
 # Abbreviations
@@ -232,3 +1445,14 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+hpastar = hierarchicalSearch
+arastar = anytimeRepairingAStarSearch
+dstar = dStarLiteSearch
+idastar = iterativeDeepeningAStarSearch
+rbfs = recursiveBestFirstSearch
+hdastar = hashDistributedAStarSearch
+extastar = externalMemorySearch
+extucs = externalUniformCostSearch
@@ -37,9 +37,14 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
+import collections
+import heapq
+import json
+from array import array
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -68,18 +73,36 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalSearch or bibfs
+      bidirectionalAStarSearch or biastar
+      jumpPointSearch or jps
+      hierarchicalSearch or hpastar
+      iterativeDeepeningAStarSearch or idastar
+      recursiveBestFirstSearch or rbfs
+      anytimeRepairingAStarSearch or arastar
+      dStarLiteSearch or dstar
+      hashDistributedAStarSearch or hdastar
+      externalMemorySearch or extastar
+      externalUniformCostSearch or extucs
+      heldKarpFoodSearch (in this file, for FoodSearchProblem)
 
 
     Note: You should NOT change any code in SearchAgent
     """
+    heuristic = None   # the heuristic searchFunction was combined with, if any
+    searchStats = None # 'json' to print the search's SearchStats (pacman.py --searchStats)
+    layoutName = None  # included with the printed statistics
 
     def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
-        if fn not in dir(search):
-            raise AttributeError(fn + ' is not a search function in search.py.')
-        func = getattr(search, fn)
+        if fn in dir(search):
+            func = getattr(search, fn)
+        elif fn in globals().keys() and fn.endswith('Search'):
+            func = globals()[fn] # a solver for a particular problem, like heldKarpFoodSearch
+        else:
+            raise AttributeError(fn + ' is not a search function in search.py or searchAgents.py.')
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
             self.searchFunction = func
@@ -92,7 +115,8 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x, heuristic=heur: func(x, heuristic=heuristic)
+            self.heuristic = heur
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -112,10 +136,20 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        if self.searchStats is None:
+            self.actions  = self.searchFunction(problem) # Find a path
+        else:
+            self.actions, stats = search.searchWithStats(self.searchFunction, problem, self.heuristic)
+        if 'expandActions' in dir(problem): self.actions = problem.expandActions(self.actions)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_peakNodes' in dir(problem): print('Peak search nodes in memory: %d' % problem._peakNodes)
+        if '_heuristicCache' in dir(problem):
+            print('Heuristic values computed: %d, reused: %d' % (problem._heuristicCache.misses, problem._heuristicCache.hits))
+        if self.searchStats == 'json':
+            record = dict(stats.asDict(), layout=self.layoutName, problem=type(problem).__name__, cost=totalCost)
+            print(json.dumps(record, sort_keys=True))
 
     def getAction(self, state):
         """
@@ -153,11 +187,14 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.startingGameState = gameState
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
         self.costFn = costFn
         self.visualize = visualize
+        self.costOverrides = {} # position -> cost set by setCellCost, in place of costFn's
+        self.changedCells = set()
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print('Warning: this does not look like a regular search maze')
 
@@ -210,6 +247,60 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def setCellCost(self, position, cost):
+        """
+        Changes the cost of stepping into position, for example when a ghost
+        blocks a corridor: float('inf') makes the cell impassable and None
+        restores the cost given by the original costFn.  Incremental searches
+        (search.DStarLite) collect the changes with takeChangedCells and repair
+        their previous plan instead of starting over.
+        """
+        if 'baseCostFn' not in dir(self):
+            baseCostFn, overrides = self.costFn, self.costOverrides
+            self.baseCostFn = baseCostFn
+            self.costFn = lambda pos: overrides[pos] if pos in overrides else baseCostFn(pos)
+        if cost is None:
+            self.costOverrides.pop(position, None)
+        else:
+            self.costOverrides[position] = cost
+        self.changedCells.add(position)
+
+    def takeChangedCells(self):
+        "Returns the positions whose cost changed since the last call."
+        changed, self.changedCells = self.changedCells, set()
+        return changed
+
+    def getGoalState(self):
+        "Returns the single goal position, for bidirectional search."
+        return self.goal
+
+    def getWalls(self):
+        "Returns the walls Grid, for searches that work on the grid directly (jps)."
+        return self.walls
+
+    def getPredecessors(self, state):
+        """
+        Returns (predecessor, action, stepCost) triples for the positions from
+        which one move reaches state, where action is that move; used by the
+        backward half of a bidirectional search.
+        """
+        predecessors = []
+        cost = self.costFn(state)
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x,y = state
+            dx, dy = Actions.directionToVector(action)
+            prevx, prevy = int(x - dx), int(y - dy)
+            if not self.walls[prevx][prevy]:
+                predecessors.append( ( (prevx, prevy), action, cost) )
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -250,6 +341,22 @@ class StayWestSearchAgent(SearchAgent):
         costFn = lambda pos: 2 ** pos[0]
         self.searchType = lambda state: PositionSearchProblem(state, costFn)
 
+class AnytimeSearchAgent(SearchAgent):
+    """
+    A SearchAgent that plans with anytime repairing A* (search.arastar), so a
+    plan is ready within a time limit even when an optimal one is not.  The
+    starting weight on the heuristic, how much it drops between searches and
+    the deadline in seconds can all be given as agent arguments, e.g.
+
+    python pacman.py -l bigMaze -p AnytimeSearchAgent -a heuristic=manhattanHeuristic,weight=5,deadline=0.1
+    """
+    def __init__(self, prob='PositionSearchProblem', heuristic='nullHeuristic', weight='3.0', step='0.5', deadline='1.0'):
+        SearchAgent.__init__(self, 'anytimeRepairingAStarSearch', prob, heuristic)
+        heur = globals()[heuristic] if heuristic in globals() else getattr(search, heuristic)
+        weight, step, deadline = float(weight), float(step), float(deadline)
+        self.searchFunction = lambda x, heuristic=heur: search.anytimeRepairingAStarSearch(x, heuristic, weight, deadline, step)
+        self.heuristic = heur
+
 def manhattanHeuristic(position, problem, info={}):
     "The Manhattan distance heuristic for a PositionSearchProblem"
     xy1 = position
@@ -262,6 +369,29 @@ def euclideanHeuristic(position, problem, info={}):
     xy2 = problem.goal
     return ( (xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2 ) ** 0.5
 
+def landmarkHeuristic(position, problem, info={}):
+    """
+    The ALT landmark heuristic for a PositionSearchProblem: the triangle
+    inequality bound from the layout's LandmarkTable (see getLandmarks), or
+    the Manhattan distance where that is larger.  Both are maze-distance
+    lower bounds, so this is admissible and consistent when steps cost at
+    least 1, and much tighter than Manhattan around long detours.  Layouts
+    small enough for a MazeDistances table get the exact maze distance
+    instead.  The bound is looked up once per problem and kept in
+    problem.heuristicInfo.
+    """
+    heuristicInfo = getattr(problem, 'heuristicInfo', None)
+    if heuristicInfo is None:
+        heuristicInfo = problem.heuristicInfo = {}
+    if 'landmarkBound' not in heuristicInfo:
+        distances = getMazeDistances(problem.startingGameState)
+        if isinstance(distances, MazeDistances):
+            heuristicInfo['landmarkBound'] = distances.getDistance
+        else:
+            heuristicInfo['landmarkBound'] = getLandmarks(problem.startingGameState).lowerBound
+    bound = heuristicInfo['landmarkBound'](position, problem.goal)
+    return max(bound, manhattanHeuristic(position, problem))
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -288,7 +418,12 @@ class CornersProblem(search.SearchProblem):
         # Please add any code here which you would like to use
         # in initializing the problem
         "*** YOUR CODE HERE ***"
-        self.initialState = [0,0,0,0]
+        self.startingGameState = startingGameState
+        self.heuristicInfo = {} # A dictionary for the heuristic to store information
+        # A state is (x, y, cornerMask), where bit i of cornerMask is set once
+        # self.corners[i] has been visited; cornerBits maps a corner to its bit.
+        self.cornerBits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        self.allCorners = (1 << len(self.corners)) - 1
 
     def getStartState(self):
         """
@@ -296,21 +431,15 @@ class CornersProblem(search.SearchProblem):
         space)
         """
         "*** YOUR CODE HERE ***"
-        return (self.startingPosition, self.initialState)
-        
-        util.raiseNotDefined()
+        x, y = self.startingPosition
+        return (x, y, self.cornerBits.get(self.startingPosition, 0))
 
     def isGoalState(self, state):
         """
         Returns whether this search state is a goal state of the problem.
         """
         "*** YOUR CODE HERE ***"
-        for cornerStatus in state[1]:
-            if cornerStatus == 0:
-                return False
-
-        return True
-        util.raiseNotDefined()
+        return state[2] == self.allCorners
 
     def getSuccessors(self, state):
         """
@@ -324,6 +453,7 @@ class CornersProblem(search.SearchProblem):
         """
 
         successors = []
+        x, y, cornerMask = state
         for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
             # Add a successor state to the successor list if the action is legal
             # Here's a code snippet for figuring out whether a new position hits a wall:
@@ -333,20 +463,13 @@ class CornersProblem(search.SearchProblem):
             #   hitsWall = self.walls[nextx][nexty]
 
             "*** YOUR CODE HERE ***"
-            x,y = state[0]
-            corn = state[1][:]
-            print(corn)
-
             dx, dy = Actions.directionToVector(action)
             nextx, nexty = int(x + dx), int(y + dy)
             hitsWall = self.walls[nextx][nexty]
 
             if not hitsWall:
-                if (nextx, nexty) in self.corners:
-                    corn[self.corners.index((nextx, nexty))] = 1
-                nextState = ((nextx, nexty),corn)
-                cost = 1
-                successors.append((nextState, action, cost))
+                nextMask = cornerMask | self.cornerBits.get((nextx, nexty), 0)
+                successors.append(((nextx, nexty, nextMask), action, 1))
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -382,25 +505,27 @@ def cornersHeuristic(state, problem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    from util import manhattanDistance
-
     if problem.isGoalState(state):
         return 0
 
-    else:
-        distancesFromGoals = []
+    if 'distances' not in problem.heuristicInfo:
+        problem.heuristicInfo['distances'] = getMazeDistances(problem.startingGameState)
+    distances = problem.heuristicInfo['distances']
 
-        for index,item in enumerate(state[1]):
-            if item == 0:
-                distancesFromGoals.append(manhattanDistance(state[0], corners[index]))
+    position = (state[0], state[1])
+    distancesFromGoals = []
+    for corner in corners:
+        if not state[2] & problem.cornerBits[corner]:
+            distancesFromGoals.append(distances.getDistance(position, corner))
 
-        return max(distancesFromGoals)
+    return max(distancesFromGoals)
 #    return 0 # Default to trivial solution
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
+        self.searchFunction = lambda prob, heuristic=cornersHeuristic: search.aStarSearch(prob, heuristic=heuristic)
+        self.heuristic = cornersHeuristic
         self.searchType = CornersProblem
 
 class FoodSearchProblem:
@@ -418,6 +543,7 @@ class FoodSearchProblem:
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
+        self.foodCells = startingGameState.getFood().asList() # food k is bit k of getFoodMask
 
     def getStartState(self):
         return self.start
@@ -442,7 +568,7 @@ class FoodSearchProblem:
     def getCostOfActions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
-        x,y= self.getStartState()[0]
+        x,y= self.getPacmanPosition(self.getStartState())
         cost = 0
         for action in actions:
             # figure out the next state and see whether it's legal
@@ -453,10 +579,93 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+    def getPacmanPosition(self, state):
+        "Returns Pacman's (x,y) position in a search state."
+        return state[0]
+
+    def getFoodGrid(self, state):
+        "Returns the remaining food in a search state as a Grid."
+        return state[1]
+
+    def getFoodList(self, state):
+        "Returns the (x,y) positions of the remaining food in a search state."
+        return state[1].asList()
+
+    def getFoodMask(self, state):
+        "Returns the remaining food as an int whose bit k stands for self.foodCells[k]."
+        foodGrid, foodMask = state[1], 0
+        for k, (x, y) in enumerate(self.foodCells):
+            if foodGrid[x][y]:
+                foodMask |= 1 << k
+        return foodMask
+
+    def packState(self, state):
+        "Returns a search state as a short byte string, for search.externalMemorySearch."
+        x, y = self.getPacmanPosition(state)
+        foodBytes = (len(self.foodCells) + 7) // 8
+        return x.to_bytes(2, 'little') + y.to_bytes(2, 'little') + self.getFoodMask(state).to_bytes(foodBytes, 'little')
+
+class BitmaskFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem with a compact, integer-only state representation.
+
+    A search state in this problem is a tuple ( positionIndex, foodMask ) where
+      positionIndex: the index of Pacman's cell in self.cells
+      foodMask:      an int whose bit k is set while the food at
+                     self.foodCells[k] has not been eaten
+
+    Successors, goal tests and hashing therefore never touch a Grid.  Use
+    getPacmanPosition, getFoodGrid and getFoodList to convert a state back.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        walls = self.walls
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.foodBits = [0] * len(self.cells) # cell index -> bit of the food on it
+        for k, cell in enumerate(self.foodCells):
+            self.foodBits[self.cellIndex[cell]] = 1 << k
+        self.moves = [] # cell index -> [(next cell index, direction)]
+        for x, y in self.cells:
+            moves = []
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not walls[nextx][nexty]:
+                    moves.append((self.cellIndex[(nextx, nexty)], direction))
+            self.moves.append(moves)
+        self.start = (self.cellIndex[startingGameState.getPacmanPosition()], (1 << len(self.foodCells)) - 1)
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        food, foodBits = state[1], self.foodBits
+        return [((cell, food & ~foodBits[cell]), direction, 1) for cell, direction in self.moves[state[0]]]
+
+    def getPacmanPosition(self, state):
+        return self.cells[state[0]]
+
+    def getFoodGrid(self, state):
+        grid = Grid(self.walls.width, self.walls.height, False)
+        for x, y in self.getFoodList(state):
+            grid[x][y] = True
+        return grid
+
+    def getFoodList(self, state):
+        food = state[1]
+        return [cell for k, cell in enumerate(self.foodCells) if food >> k & 1]
+
+    def getFoodMask(self, state):
+        return state[1]
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
+        self.searchFunction = lambda prob, heuristic=foodHeuristic: search.aStarSearch(prob, heuristic=heuristic)
+        self.heuristic = foodHeuristic
         self.searchType = FoodSearchProblem
 
 def foodHeuristic(state, problem):
@@ -474,7 +683,10 @@ def foodHeuristic(state, problem):
 
     The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
     (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    a list of food coordinates instead.  States of a BitmaskFoodSearchProblem
+    are packed into integers, so this heuristic reads them through
+    problem.getPacmanPosition(state) and problem.getFoodList(state), which
+    work for either representation.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -487,35 +699,155 @@ def foodHeuristic(state, problem):
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
     """
-    position, foodGrid = state
     "*** YOUR CODE HERE ***"
-    foodList = foodGrid.asList()
-    problem.heuristicInfo['wallCount'] = problem.walls.count()
-    
-    if problem.isGoalState(state):
+    # h = (maze distance to the nearest dot) + (cost of a minimum spanning
+    # tree over the remaining dots).  Any path that eats every dot has to
+    # reach one of them and then connect them all, so this is admissible; it
+    # changes by at most one per step, so it is consistent too.
+    foodMask = problem.getFoodMask(state)
+    if foodMask == 0:
         return 0
-        
-    distance = []
-    
-    for item in foodList:
-        distance.append(mazeDistance(position, item, problem.startingGameState))
 
-    return max(distance)
+    info = problem.heuristicInfo
+    if 'distances' not in info:
+        info['distances'] = getMazeDistances(problem.startingGameState)
+    if 'foodEdges' not in info:
+        info['foodEdges'] = foodEdges(problem.foodCells, info['distances'])
+        info['mstCache'] = collections.OrderedDict()
+    distances = info['distances']
+
+    position = problem.getPacmanPosition(state)
+    nearest = min(distances.getDistance(position, cell)
+                  for k, cell in enumerate(problem.foodCells) if foodMask >> k & 1)
+    return nearest + spanningTreeCost(foodMask, info['foodEdges'], info['mstCache'])
+
+MST_CACHE_SIZE = 100000
+
+def foodEdges(foodCells, distances):
+    """
+    Returns every pair of food dots as (mazeDistance, i, j), sorted by distance,
+    where i and j index foodCells.
+    """
+    edges = []
+    for i in range(len(foodCells)):
+        for j in range(i + 1, len(foodCells)):
+            edges.append((distances.getDistance(foodCells[i], foodCells[j]), i, j))
+    edges.sort()
+    return edges
+
+def spanningTreeCost(foodMask, edges, cache):
+    """
+    Returns the cost of a minimum spanning tree over the dots whose bits are set
+    in foodMask, using Kruskal's algorithm over the presorted edges.  Results
+    are kept in cache (an OrderedDict) and the least recently used mask is
+    evicted once it holds more than MST_CACHE_SIZE trees.
+    """
+    if foodMask in cache:
+        cache.move_to_end(foodMask)
+        return cache[foodMask]
+    remaining = bin(foodMask).count('1') - 1 # edges still missing from the tree
+    components = util.UnionFind()
+    cost = 0
+    for distance, i, j in edges:
+        if remaining == 0:
+            break
+        if foodMask >> i & 1 and foodMask >> j & 1 and components.union(i, j):
+            cost += distance
+            remaining -= 1
+    cache[foodMask] = cost
+    if len(cache) > MST_CACHE_SIZE:
+        cache.popitem(last=False)
+    return cost
+
+HELD_KARP_LIMIT = 15 # food dots; the table fill takes about half a second at 15 and doubles per dot
+
+def heldKarpFoodSearch(problem):
+    """
+    Solves a FoodSearchProblem (or BitmaskFoodSearchProblem) exactly with the
+    Held-Karp dynamic program instead of searching its state space.  An
+    optimal plan eats the dots in some order, walking a shortest maze path
+    from each to the next, so its cost is that of the shortest path from
+    Pacman through every dot, with maze distances (getMazeDistances) as the
+    edge costs.
+
+    Entry mask * n + j of the table is the length of the shortest such path
+    that eats exactly the dots in mask and ends on dot j.  Masks are filled in
+    increasing order, each from the masks with one dot fewer, and the order of
+    the dots is read back from the cheapest full mask by finding which entry
+    each one was reached from.  The table has n * 2**n entries for n dots, so
+    layouts with more than HELD_KARP_LIMIT dots are refused.
+
+    Select it like a search function: -a fn=heldKarpFoodSearch,prob=FoodSearchProblem
+    """
+    import operator
+    state = problem.getStartState()
+    position, dots = problem.getPacmanPosition(state), problem.getFoodList(state)
+    n = len(dots)
+    if n == 0:
+        return []
+    if n > HELD_KARP_LIMIT:
+        raise Exception('heldKarpFoodSearch handles at most %d dots, not %d' % (HELD_KARP_LIMIT, n))
+    distances = getMazeDistances(problem.startingGameState)
+    between = [[distances.getDistance(dot, other) for other in dots] for dot in dots]
+    infinity = 1 << 30
+    table = array('i', [infinity]) * (n << n)
+    for j, dot in enumerate(dots):
+        table[(1 << j) * n + j] = distances.getDistance(position, dot)
+    for mask in range(3, 1 << n):
+        if mask & (mask - 1) == 0:
+            continue
+        for j in range(n):
+            if mask >> j & 1:
+                start = (mask ^ 1 << j) * n
+                table[mask * n + j] = min(map(operator.add, table[start:start + n], between[j]))
+    problem._expanded += n << (n - 1) # each table entry filled counts as a node
+
+    full = (1 << n) - 1
+    cost, j = min((table[full * n + j], j) for j in range(n))
+    if cost >= UNREACHABLE:
+        return []
+    order, mask = [j], full
+    while mask != 1 << j:
+        previous = mask ^ 1 << j
+        j = next(i for i in range(n)
+                 if previous >> i & 1 and table[previous * n + i] + between[i][j] == table[mask * n + j])
+        order.append(j)
+        mask = previous
+    order.reverse()
+
+    # Walk downhill in maze distance from each dot to the next.
+    actions, cell = [], position
+    for j in order:
+        dot = dots[j]
+        while cell != dot:
+            remaining = distances.getDistance(cell, dot)
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextCell = (int(cell[0] + dx), int(cell[1] + dy))
+                if not problem.walls[nextCell[0]][nextCell[1]] and distances.getDistance(nextCell, dot) == remaining - 1:
+                    break
+            actions.append(direction)
+            cell = nextCell
+    return actions
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        walls = state.getWalls()
+        position = state.getPacmanPosition()
+        self.foodIndex = NearestFoodIndex(walls, state.getFood())
+        while self.foodIndex.hasFood():
+            nextPathSegment = self.foodIndex.getPathToNearest(position) # The missing piece
+            if not nextPathSegment:
+                raise Exception('No path to the remaining food from %s' % str(position))
             self.actions += nextPathSegment
             for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+                x, y = Actions.getSuccessor(position, action)
+                if walls[int(x)][int(y)]:
+                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % (str(action), str(position)))
+                position = (int(x), int(y))
+            self.foodIndex.removeFood(position)
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -528,17 +860,101 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-#        temp = food.asList()
+        return NearestFoodIndex(walls, food).getPathToNearest(startPosition)
 
-        from search import breadthFirstSearch
-        from search import depthFirstSearch
+class NearestFoodIndex:
+    """
+    The maze distance from every open cell to the nearest remaining food.
 
-        return breadthFirstSearch(problem)
-#        return depthFirstSearch(problem)
-        util.raiseNotDefined()
+    The distance field starts as a single BFS seeded with every dot at once.
+    When a dot is eaten, only the cells whose distance was supported by that
+    dot are recomputed, so keeping the field current costs time proportional
+    to the region the dot used to serve, not to the whole maze.  A path to the
+    nearest dot is read off the field by stepping downhill from Pacman.
+    """
+
+    def __init__(self, walls, food):
+        self.walls = walls
+        self.food = set(food.asList())
+        self.neighbors = {}
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y]:
+                    self.neighbors[(x, y)] = [n for n in Actions.getLegalNeighbors((x, y), walls) if n != (x, y)]
+        self.distance = dict((cell, 0) for cell in self.food) # unreachable cells are absent
+        layer = list(self.food)
+        while layer:
+            nextLayer = []
+            for cell in layer:
+                for neighbor in self.neighbors[cell]:
+                    if neighbor not in self.distance:
+                        self.distance[neighbor] = self.distance[cell] + 1
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+
+    def hasFood(self):
+        return len(self.food) > 0
+
+    def getDistance(self, cell):
+        "Returns the maze distance from cell to the nearest food, or None if there is none."
+        return self.distance.get(cell)
+
+    def getPathToNearest(self, start):
+        "Returns the actions of a shortest path from start to the nearest food."
+        if start not in self.distance:
+            return []
+        actions = []
+        cell = start
+        while self.distance[cell] > 0:
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextCell = (int(cell[0] + dx), int(cell[1] + dy))
+                if self.distance.get(nextCell) == self.distance[cell] - 1:
+                    break
+            actions.append(direction)
+            cell = nextCell
+        return actions
+
+    def removeFood(self, cell):
+        "Marks the food at cell as eaten and repairs the distance field."
+        if cell not in self.food:
+            return
+        self.food.remove(cell)
+        distance, neighbors = self.distance, self.neighbors
+
+        # Cells that lose every neighbour one step closer to food, working
+        # outwards from the eaten dot one distance layer at a time.
+        affected = set([cell])
+        layer = [cell]
+        while layer:
+            nextLayer = []
+            for c in layer:
+                for n in neighbors[c]:
+                    if n in affected or n in self.food or distance.get(n) != distance[c] + 1:
+                        continue
+                    if all(m in affected or distance.get(m) != distance[n] - 1 for m in neighbors[n]):
+                        affected.add(n)
+                        nextLayer.append(n)
+            layer = nextLayer
+
+        # Re-seed the affected region from its unaffected border and relax it.
+        for c in affected:
+            del distance[c]
+        frontier = []
+        for c in affected:
+            border = [distance[m] for m in neighbors[c] if m in distance]
+            if border:
+                heapq.heappush(frontier, (min(border) + 1, c))
+        while frontier:
+            d, c = heapq.heappop(frontier)
+            if c in distance:
+                continue
+            distance[c] = d
+            for n in neighbors[c]:
+                if n in affected and n not in distance:
+                    heapq.heappush(frontier, (d + 1, n))
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -559,6 +975,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         "Stores information from the gameState.  You don't need to change this."
         # Store the food for later reference
         self.food = gameState.getFood()
+        self.foodCells = set(self.food.asList()) # for constant-time goal tests
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
@@ -574,13 +991,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         x,y = state
 
         "*** YOUR CODE HERE ***"
-        foodList = self.food.asList()
-        if state in foodList:
-            return True
-        else:
-            return False
-    
-        util.raiseNotDefined()
+        return state in self.foodCells
 
 def mazeDistance(point1, point2, gameState):
     """
@@ -591,11 +1002,486 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    The distance is looked up in the layout's MazeDistances table, which is
+    built (or loaded from disk) on first use; very large layouts use cached
+    single-source distance rows instead (see getMazeDistances).
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return getMazeDistances(gameState).getDistance(point1, point2)
+
+##################################
+# Precomputed all-pairs distances #
+##################################
+
+MAZE_DISTANCE_CACHE = {}
+UNREACHABLE = 0xFFFF
+ALL_PAIRS_LIMIT = 512 # open cells; the table takes 2 * cells ** 2 bytes and about cells ** 2 / 2 us to build
+
+def getMazeDistances(gameState):
+    """
+    Returns an object whose getDistance(point1, point2) gives maze distances on
+    the layout of gameState.  This is the MazeDistances table when the layout
+    has at most ALL_PAIRS_LIMIT open cells; tables are shared between all game
+    states and problems on the same walls, and are persisted in
+    util.CACHE_DIR so later runs skip the BFS altogether.  Larger layouts
+    get their LayoutBitset, which answers queries from cached distance rows,
+    one BFS per distinct target.
+    """
+    walls = gameState.getWalls()
+    key = util.wallsDigest(walls)
+    if key not in MAZE_DISTANCE_CACHE:
+        if walls.count(False) <= ALL_PAIRS_LIMIT:
+            MAZE_DISTANCE_CACHE[key] = MazeDistances(walls, key)
+        else:
+            MAZE_DISTANCE_CACHE[key] = getLayoutBitset(gameState)
+    return MAZE_DISTANCE_CACHE[key]
+
+def getLayoutBitset(gameState):
+    "Returns the LayoutBitset for the walls of gameState, shared per walls."
+    walls = gameState.getWalls()
+    key = util.wallsDigest(walls)
+    if key not in LAYOUT_BITSET_CACHE:
+        LAYOUT_BITSET_CACHE[key] = LayoutBitset(walls)
+    return LAYOUT_BITSET_CACHE[key]
+
+LAYOUT_BITSET_CACHE = {}
+NARROW_LAYER_BITS = 8192       # bits of layout per cell below which a BFS layer is cheaper cell by cell
+DISTANCE_ROW_BUDGET = 64 << 20 # bytes of LayoutBitset distance rows kept per layout
+
+class LayoutBitset:
+    """
+    Unit-cost breadth-first search over a layout, a whole BFS layer at a time.
+
+    Cell (x,y) is bit y * stride + x of a Python int, where stride is one more
+    than the width so that each row ends in a padding bit that is never open.
+    The neighbours of every cell in a frontier are then the frontier shifted
+    by 1 and by stride in both directions, ANDed with the mask of open cells,
+    so each BFS layer costs a handful of big-integer operations instead of one
+    Python step per cell.  Sources are lists of (x,y) cells.
+
+    Point-to-point distances come from whole distance rows, kept per source
+    cell, so repeated queries towards the same targets cost one lookup each.
+    """
+
+    def __init__(self, walls):
+        self.width, self.height = walls.width, walls.height
+        self.stride = walls.width + 1
+        rows = []
+        for y in range(self.height - 1, -1, -1):
+            rows.append('0' + ''.join('0' if walls[x][y] else '1' for x in range(self.width - 1, -1, -1)))
+        self.open = int(''.join(rows), 2)
+        self.openCells = bytearray(self.height * self.stride) # 1 at the bit number of each open cell
+        for x in range(self.width):
+            for y in range(self.height):
+                if not walls[x][y]:
+                    self.openCells[y * self.stride + x] = 1
+        self.rows = collections.OrderedDict() # source cell -> getDistancesFrom row
+
+    def getMask(self, cells):
+        "Returns the bitmask of a list of (x,y) cells."
+        mask = 0
+        for x, y in cells:
+            mask |= 1 << (y * self.stride + x)
+        return mask
+
+    def getCells(self, mask):
+        "Returns the (x,y) cells whose bits are set in mask."
+        cells, stride = [], self.stride
+        while mask:
+            low = mask & -mask
+            bit = low.bit_length() - 1
+            cells.append((bit % stride, bit // stride))
+            mask ^= low
+        return cells
+
+    def layers(self, sources):
+        "Yields (distance, layerMask) for each BFS layer around the sources."
+        stride, open = self.stride, self.open
+        frontier = self.getMask(sources) & open
+        seen, distance = frontier, 0
+        while frontier:
+            yield distance, frontier
+            frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & open & ~seen
+            seen |= frontier
+            distance += 1
+
+    def getDistance(self, point1, point2):
+        """
+        Returns the maze distance from point1 to point2 (UNREACHABLE if there
+        is no path), from the cached distance row of either point, or else a
+        new row from point2: callers such as the heuristics and the ghosts ask
+        for distances to the same few targets over and over.
+        """
+        for source, target in ((point2, point1), (point1, point2)):
+            if source in self.rows:
+                self.rows.move_to_end(source)
+                return self.rows[source][target[1] * self.stride + target[0]]
+        return self.getDistancesFrom(point2)[point1[1] * self.stride + point1[0]]
+
+    def getRowIndex(self, point):
+        "Returns the index of point in the rows of getDistancesFrom: its bit number."
+        return point[1] * self.stride + point[0]
+
+    def getDistancesFrom(self, point):
+        """
+        Returns the distances from point as a uint32 array indexed by bit
+        number (y * stride + x), UNREACHABLE for walls and cells out of reach.
+        The least recently used rows are dropped once they take up more than
+        DISTANCE_ROW_BUDGET bytes.
+        """
+        if point in self.rows:
+            self.rows.move_to_end(point)
+            return self.rows[point]
+        row = array('I', [UNREACHABLE]) * (self.height * self.stride)
+        for (x, y), distance in self.getDistanceMap([point]).items():
+            row[y * self.stride + x] = distance
+        self.rows[point] = row
+        while len(self.rows) > max(1, DISTANCE_ROW_BUDGET // (row.itemsize * len(row))):
+            self.rows.popitem(last=False)
+        return row
+
+    def getDistanceMap(self, sources):
+        """
+        Returns a dictionary from every cell reachable from the sources to its
+        distance from the nearest source.
+
+        A shift-and-mask layer costs time in proportion to the whole layout,
+        so once a layer turns out narrower than one cell per NARROW_LAYER_BITS
+        bits of layout, as in the long corridors of a generated maze, the rest
+        of the search expands one cell at a time.
+        """
+        distances = {}
+        narrow = self.height * self.stride // NARROW_LAYER_BITS
+        for distance, layer in self.layers(sources):
+            cells = self.getCells(layer)
+            for cell in cells:
+                distances[cell] = distance
+            if len(cells) < narrow:
+                break
+        else:
+            return distances
+        while cells:
+            distance += 1
+            nextCells = []
+            for x, y in cells:
+                for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if neighbor not in distances and self.isOpen(neighbor):
+                        distances[neighbor] = distance
+                        nextCells.append(neighbor)
+            cells = nextCells
+        return distances
+
+    def isOpen(self, cell):
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height and self.openCells[y * self.stride + x] == 1
+
+class MazeDistances:
+    """
+    Shortest-path distances between every pair of open cells of a layout.
+
+    The open cells are numbered in column-major order and the distances are
+    kept in a flat uint16 array, where entry i * n + j is the number of moves
+    from cell i to cell j (UNREACHABLE if there is no path).  The table is
+    filled by one BFS per cell over a precomputed integer adjacency list, and
+    stored in util.CACHE_DIR under the walls digest when a key is given.
+    """
+
+    def __init__(self, walls, key=None):
+        self.walls = walls
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.index = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.size = len(self.cells)
+        self.neighbors = [[self.index[n] for n in Actions.getLegalNeighbors(cell, walls) if n != cell]
+                          for cell in self.cells]
+        self.table = None
+        if key is not None:
+            self.table = self._load(key)
+        if self.table is None:
+            self.table = self._computeTable()
+            if key is not None:
+                self._save(key)
+
+    def getDistance(self, point1, point2):
+        """
+        Returns the maze distance from point1 to point2, or UNREACHABLE if
+        there is no path, as when either of them is a wall (like
+        LayoutBitset.getDistance).
+
+        >>> import layout
+        >>> distances = MazeDistances(layout.getLayout('tinyCorners').walls)
+        >>> distances.getDistance((1, 1), (6, 6))
+        10
+        >>> distances.getDistance((0, 0), (1, 1)) == UNREACHABLE
+        True
+        """
+        if point1 not in self.index or point2 not in self.index:
+            return UNREACHABLE
+        return self.table[self.index[point1] * self.size + self.index[point2]]
+
+    def getDistancesFrom(self, point):
+        "Returns the row of distances from point, indexed like self.cells."
+        start = self.index[point] * self.size
+        return self.table[start:start + self.size]
+
+    def _computeTable(self):
+        n, neighbors = self.size, self.neighbors
+        table = array('H', [UNREACHABLE]) * (n * n)
+        for source in range(n):
+            row = source * n
+            table[row + source] = 0
+            layer, distance = [source], 0
+            while layer:
+                distance += 1
+                nextLayer = []
+                for cell in layer:
+                    for neighbor in neighbors[cell]:
+                        if table[row + neighbor] == UNREACHABLE:
+                            table[row + neighbor] = distance
+                            nextLayer.append(neighbor)
+                layer = nextLayer
+        return table
+
+    def _load(self, key):
+        def read(f):
+            table = array('H')
+            table.fromfile(f, self.size * self.size)
+            return table
+        return util.readCacheFile(key + '.dist', read)
+
+    def _save(self, key):
+        util.writeCacheFile(key + '.dist', self.table.tofile)
+
+######################
+# Landmark heuristics #
+######################
+
+LANDMARK_COUNT = 8
+LANDMARK_CACHE = {}
+
+def getLandmarks(gameState, count=LANDMARK_COUNT):
+    """
+    Returns the LandmarkTable with count landmarks for the layout of
+    gameState, shared between all problems on the same walls and persisted in
+    util.CACHE_DIR.  It is built on the layout's LayoutBitset, as layouts
+    small enough for a MazeDistances table are better off with its exact
+    distances.
+    """
+    walls = gameState.getWalls()
+    key = '%s-%d' % (util.wallsDigest(walls), count)
+    if key not in LANDMARK_CACHE:
+        LANDMARK_CACHE[key] = LandmarkTable(getLayoutBitset(gameState), count, key)
+    return LANDMARK_CACHE[key]
+
+class LandmarkTable:
+    """
+    Maze distances from a few landmark cells to every open cell, for the ALT
+    (A*, landmarks, triangle inequality) lower bound: for any landmark L,
+    d(a, b) >= |d(L, b) - d(L, a)|.
+
+    Landmarks are picked by farthest-point selection: the first is the cell
+    farthest from the first open cell, and each next one the cell farthest
+    from all the landmarks so far, so they end up on the outskirts of the
+    maze, behind the detours the Manhattan distance does not see.  Each
+    landmark's distances are its LayoutBitset distance row, and the rows are
+    stored in util.CACHE_DIR under key when one is given.
+    """
+
+    def __init__(self, bitset, count, key=None):
+        self.bitset = bitset
+        self.bits = [bit for bit, isOpen in enumerate(bitset.openCells) if isOpen]
+        self.count = min(count, len(self.bits))
+        self.rows = None
+        if key is not None:
+            self.rows = self._load(key)
+        if self.rows is None:
+            self.rows = self._selectLandmarks()
+            if key is not None:
+                self._save(key)
+
+    def lowerBound(self, point1, point2):
+        "Returns the largest landmark lower bound on the maze distance between two open cells."
+        i, j = self.bitset.getRowIndex(point1), self.bitset.getRowIndex(point2)
+        bound = 0
+        for row in self.rows:
+            a, b = row[i], row[j]
+            if a != UNREACHABLE and b != UNREACHABLE and abs(a - b) > bound:
+                bound = abs(a - b)
+        return bound
+
+    def _selectLandmarks(self):
+        rows = []
+        if self.count == 0:
+            return rows
+        bits, stride = self.bits, self.bitset.stride
+        # Distance to the nearest landmark so far; unreachable cells count as
+        # far away, so every part of a disconnected maze gets one eventually.
+        row = self.bitset.getDistancesFrom((bits[0] % stride, bits[0] // stride))
+        nearest = [row[bit] for bit in bits]
+        for _ in range(self.count):
+            landmark = bits[max(range(len(bits)), key=nearest.__getitem__)]
+            row = self.bitset.getDistancesFrom((landmark % stride, landmark // stride))
+            rows.append(row)
+            nearest = list(map(min, nearest, [row[bit] for bit in bits]))
+        return rows
+
+    def _load(self, key):
+        size = len(self.bitset.openCells)
+        def read(f):
+            table = array('I')
+            table.fromfile(f, self.count * size)
+            return [table[i * size:(i + 1) * size] for i in range(self.count)]
+        return util.readCacheFile(key + '.alt', read)
+
+    def _save(self, key):
+        def write(f):
+            for row in self.rows:
+                row.tofile(f)
+        util.writeCacheFile(key + '.alt', write)
+
+######################################
+# Corridor-compressed junction graphs #
+######################################
+
+JUNCTION_GRAPH_CACHE = {}
+
+def getJunctionGraph(gameState):
+    "Returns the JunctionGraph for the walls of gameState, shared per walls."
+    walls = gameState.getWalls()
+    key = util.wallsDigest(walls)
+    if key not in JUNCTION_GRAPH_CACHE:
+        JUNCTION_GRAPH_CACHE[key] = JunctionGraph(walls)
+    return JUNCTION_GRAPH_CACHE[key]
+
+class JunctionGraph:
+    """
+    The open cells of a layout with every corridor collapsed into one edge.
+
+    Nodes are the open cells that do not have exactly two open neighbours:
+    junctions, dead ends and isolated cells.  edges[node] is a list of
+    (endNode, actions, cells) triples, one for each way out of node, where
+    actions is the tuple of Directions that walks the corridor and cells are
+    the cells it enters, ending with endNode.  corridors[cell] lists, for each
+    corridor cell, the (node, edgeIndex, offset) of the edges that pass
+    through it, so a goal or start inside a corridor can be located directly.
+    """
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.nodes = set()
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y] and len(self._exits((x, y))) != 2:
+                    self.nodes.add((x, y))
+        self.edges = {}
+        self.corridors = {}
+        for node in self.nodes:
+            self.edges[node] = [self.walk(node, direction, self.nodes) for direction, _ in self._exits(node)]
+            for index, (_, _, cells) in enumerate(self.edges[node]):
+                for offset, cell in enumerate(cells[:-1]):
+                    self.corridors.setdefault(cell, []).append((node, index, offset))
+
+    def _exits(self, cell):
+        "Returns the (direction, nextCell) pairs that lead out of cell."
+        exits = []
+        x, y = cell
+        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            dx, dy = Actions.directionToVector(direction)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                exits.append((direction, (nextx, nexty)))
+        return exits
+
+    def walk(self, start, direction, stops):
+        """
+        Follows the corridor leaving start in direction until it reaches a cell
+        in stops (or comes back around to start) and returns the edge as an
+        (endCell, actions, cells) triple.
+        """
+        x, y = start
+        dx, dy = Actions.directionToVector(direction)
+        previous, cell = start, (int(x + dx), int(y + dy))
+        actions, cells = [direction], [cell]
+        while cell not in stops and cell != start:
+            for direction, nextCell in self._exits(cell):
+                if nextCell != previous:
+                    break
+            actions.append(direction)
+            previous, cell = cell, nextCell
+            cells.append(cell)
+        return cell, tuple(actions), tuple(cells)
+
+class JunctionSearchProblem(PositionSearchProblem):
+    """
+    A PositionSearchProblem that searches the JunctionGraph of the layout.
+
+    States are still (x,y) positions, but only junctions, dead ends, the start
+    and the goal are ever generated; every action is a whole corridor, given as
+    a tuple of Directions, and its cost is the sum of costFn over the cells it
+    enters.  Edges are weighted, so use ucs or astar rather than bfs.
+    SearchAgent turns a plan back into single steps with expandActions.
+    """
+
+    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+        PositionSearchProblem.__init__(self, gameState, costFn, goal, start, warn, visualize)
+        self.graph = getJunctionGraph(gameState)
+        # Edges running through the goal stop there instead of at their end
+        self.goalEdges = dict(((node, index), offset) for node, index, offset in self.graph.corridors.get(goal, []))
+        self.edgeCosts = {}
+
+    def getSuccessors(self, state):
+        """
+        Returns (nextJunction, corridorActions, cost) triples for every corridor
+        leaving state.
+        """
+        successors = []
+        if state in self.graph.edges:
+            for index, (end, actions, cells) in enumerate(self.graph.edges[state]):
+                if (state, index) in self.goalEdges:
+                    offset = self.goalEdges[(state, index)]
+                    end, actions, cells = self.goal, actions[:offset + 1], cells[:offset + 1]
+                    key = (state, index, offset)
+                else:
+                    key = (state, index)
+                if key not in self.edgeCosts:
+                    self.edgeCosts[key] = sum(self.costFn(cell) for cell in cells)
+                successors.append((end, actions, self.edgeCosts[key]))
+        else:
+            # The start may lie inside a corridor; walk out of it both ways.
+            stops = self.graph.nodes | set([self.goal])
+            for direction, _ in self.graph._exits(state):
+                end, actions, cells = self.graph.walk(state, direction, stops)
+                successors.append((end, actions, sum(self.costFn(cell) for cell in cells)))
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return successors
+
+    def setCellCost(self, position, cost):
+        """
+        Changes the cost of stepping into position, as for a
+        PositionSearchProblem, and forgets the remembered cost of every corridor
+        that enters it.
+        """
+        PositionSearchProblem.setCellCost(self, position, cost)
+        for key in list(self.edgeCosts):
+            cells = self.graph.edges[key[0]][key[1]][2]
+            if len(key) == 3:
+                cells = cells[:key[2] + 1]
+            if position in cells:
+                del self.edgeCosts[key]
+
+    def getPredecessors(self, state):
+        raise Exception('JunctionSearchProblem does not support bidirectional search')
+
+    def expandActions(self, actions):
+        "Flattens a plan of corridor actions into single Directions."
+        return [action for corridor in actions for action in corridor]
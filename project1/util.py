@@ -29,6 +29,8 @@
 import sys
 import inspect
 import heapq, random
+import collections
+import hashlib, itertools, mmap, os, pickle, tempfile
 
 
 class FixedRandom:
@@ -205,6 +207,93 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+    def accepts(self, priority):
+        "Any priority can be queued; see BucketQueue.accepts."
+        return True
+
+class IndexedPriorityQueue(PriorityQueue):
+    """
+      A PriorityQueue that also remembers where each entry sits in the heap,
+      so that update() can lower the priority of a queued item in O(log n)
+      instead of scanning the whole heap.  Items must therefore be hashable;
+      latest holds the items currently queued.
+    """
+    def  __init__(self):
+        PriorityQueue.__init__(self)
+        self.position = {}  # entry count -> index of that entry in self.heap
+        self.latest = {}    # item -> count of its most recently pushed entry
+
+    def push(self, item, priority):
+        entry = (priority, self.count, item)
+        self.heap.append(entry)
+        self.position[self.count] = len(self.heap) - 1
+        self.latest[item] = self.count
+        self.count += 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        last = self.heap.pop()
+        if self.heap:
+            entry, self.heap[0] = self.heap[0], last
+            self.position[last[1]] = 0
+            self._siftDown(0)
+        else:
+            entry = last
+        (_, count, item) = entry
+        del self.position[count]
+        if self.latest.get(item) == count:
+            del self.latest[item]
+        return item
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update.
+        if item not in self.latest:
+            self.push(item, priority)
+            return
+        count = self.latest[item]
+        index = self.position[count]
+        if self.heap[index][0] <= priority:
+            return
+        # The entry is renumbered, so it queues behind items of equal priority
+        # exactly as a freshly pushed copy would.
+        del self.position[count]
+        self.heap[index] = (priority, self.count, item)
+        self.position[self.count] = index
+        self.latest[item] = self.count
+        self.count += 1
+        self._siftUp(index)
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[1]] = index
+
+    def _siftDown(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        position[entry[1]] = index
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -222,6 +311,462 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+def integerKey(priority):
+    """
+    The integer that BucketQueue and RadixHeap order a priority by: the
+    priority itself, or the first element of a tuple such as (f, -g).  Returns
+    None if that is not a non-negative integer.
+    """
+    key = priority[0] if type(priority) == tuple else priority
+    if type(key) != int or key < 0:
+        return None
+    return key
+
+class BucketQueue:
+    """
+      A priority queue for small non-negative integer priorities, such as the
+      path costs of problems whose steps all cost 1 (Dial's algorithm).  Items
+      are kept in one bucket per priority, so pushing is O(1), and popping
+      scans up from the lowest bucket in use, which is O(1) amortized when the
+      priorities popped only creep upwards, as in UCS and A*.
+
+      The interface and the order of equal priorities are those of
+      PriorityQueue.  A priority may also be a tuple starting with the integer
+      (for A*'s (f, -g)): the tuple then orders items within their bucket.
+      Each item is queued at most once; update() leaves the old entry behind
+      and skips it when it comes up.
+
+      accepts() says whether a priority can be queued; if not, widen() moves
+      the items to a RadixHeap or IndexedPriorityQueue that can take it.
+    """
+    SPAN = 1 << 12 # highest priority accepted above the lowest one queued
+
+    def __init__(self):
+        self.buckets = {}   # integer key -> (priority, count, item) entries, a heap
+                            # for tuple priorities and otherwise a deque
+        self.lowest = 0     # no bucket below this one holds a live entry
+        self.lastKey = 0    # key of the last item popped
+        self.count = 0
+        self.latest = {}    # queued item -> (count, priority) of its live entry
+
+    def push(self, item, priority):
+        key = integerKey(priority)
+        bucket = self.buckets.get(key)
+        if type(priority) == tuple:
+            if bucket is None:
+                bucket = self.buckets[key] = []
+            heapq.heappush(bucket, (priority, self.count, item))
+        else:
+            # All priorities in the bucket are equal, so it is first in, first out.
+            if bucket is None:
+                bucket = self.buckets[key] = collections.deque()
+            bucket.append((priority, self.count, item))
+        self.latest[item] = (self.count, priority)
+        self.count += 1
+        if key < self.lowest:
+            self.lowest = key
+
+    def pop(self):
+        buckets, latest = self.buckets, self.latest
+        if not latest:
+            raise IndexError('pop from an empty queue')
+        while True:
+            bucket = buckets.get(self.lowest)
+            if not bucket:
+                buckets.pop(self.lowest, None)
+                self.lowest += 1
+                continue
+            if type(bucket) == list:
+                priority, count, item = heapq.heappop(bucket)
+            else:
+                priority, count, item = bucket.popleft()
+            if latest.get(item, (None,))[0] == count:
+                del latest[item]
+                self.lastKey = self.lowest
+                return item
+
+    def isEmpty(self):
+        return len(self.latest) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update.
+        if item in self.latest and self.latest[item][1] <= priority:
+            return
+        self.push(item, priority)
+
+    def accepts(self, priority):
+        key = integerKey(priority)
+        return key is not None and key - min(self.lowest, self.lastKey) <= self.SPAN
+
+    def entries(self):
+        "Returns the queued (priority, item) pairs, in the order they would be popped."
+        live = [(priority, count, item) for item, (count, priority) in self.latest.items()]
+        live.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(priority, item) for priority, count, item in live]
+
+    def widen(self, priority):
+        """
+        Returns a RadixHeap, or failing that an IndexedPriorityQueue, holding
+        the same items in the same order, that accepts priority.
+        """
+        key = integerKey(priority)
+        if key is not None and key >= self.lastKey and self.lowest >= self.lastKey:
+            queue = RadixHeap()
+            queue.lastKey = self.lastKey
+        else:
+            queue = IndexedPriorityQueue()
+        for entryPriority, item in self.entries():
+            queue.push(item, entryPriority)
+        return queue
+
+class RadixHeap:
+    """
+      A priority queue for non-negative integer priorities of any size, as long
+      as no priority pushed is lower than the last one popped; that holds for
+      UCS, and for A* with a consistent heuristic.  An entry waits in the bucket
+      numbered by the highest bit in which its key differs from the last key
+      popped.  Popping empties the lowest non-empty bucket into lower ones, so
+      an entry moves at most once per bit: pushes are O(1) and pops O(log C)
+      amortized, C being the largest key.  The priorities of problems like
+      StayWestSearchAgent's, which grow as 2^x, would leave a BucketQueue
+      scanning through millions of empty buckets.
+
+      The interface, tuple priorities and order of equal priorities are those
+      of BucketQueue.
+    """
+    def __init__(self):
+        self.buckets = [[]]  # (priority, count, item, key) entries; bucket 0 is a heap
+                             # of the entries whose key is the last one popped
+        self.lastKey = 0
+        self.count = 0
+        self.latest = {}     # queued item -> (count, priority) of its live entry
+
+    def push(self, item, priority):
+        key = integerKey(priority)
+        index = (key ^ self.lastKey).bit_length()
+        while len(self.buckets) <= index:
+            self.buckets.append([])
+        entry = (priority, self.count, item, key)
+        if index == 0:
+            heapq.heappush(self.buckets[0], entry)
+        else:
+            self.buckets[index].append(entry)
+        self.latest[item] = (self.count, priority)
+        self.count += 1
+
+    def pop(self):
+        buckets, latest = self.buckets, self.latest
+        if not latest:
+            raise IndexError('pop from an empty queue')
+        while True:
+            if not buckets[0]:
+                self._redistribute()
+            priority, count, item, key = heapq.heappop(buckets[0])
+            if latest.get(item, (None,))[0] == count:
+                del latest[item]
+                return item
+
+    def _redistribute(self):
+        "Moves the live entries of the lowest non-empty bucket into lower buckets."
+        buckets, latest = self.buckets, self.latest
+        index = 1
+        while True:
+            live = [entry for entry in buckets[index] if latest.get(entry[2], (None,))[0] == entry[1]]
+            buckets[index] = []
+            if live:
+                break
+            index += 1
+        lastKey = self.lastKey = min([entry[3] for entry in live])
+        for entry in live:
+            buckets[(entry[3] ^ lastKey).bit_length()].append(entry)
+        heapq.heapify(buckets[0])
+
+    def isEmpty(self):
+        return len(self.latest) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update.
+        if item in self.latest and self.latest[item][1] <= priority:
+            return
+        self.push(item, priority)
+
+    def accepts(self, priority):
+        key = integerKey(priority)
+        return key is not None and key >= self.lastKey
+
+    entries = BucketQueue.entries
+
+    def widen(self, priority):
+        "Returns an IndexedPriorityQueue holding the same items in the same order."
+        queue = IndexedPriorityQueue()
+        for entryPriority, item in self.entries():
+            queue.push(item, entryPriority)
+        return queue
+
+class SpillingPriorityQueue:
+    """
+      A priority queue that keeps at most about memoryBudget bytes of entries
+      in memory.  When the entries in memory outgrow it they are sorted and
+      written out to a temporary file, a sorted run, and popping merges the
+      heads of the runs with the heap in memory.  Once there are more than
+      MAX_RUNS runs they are merged into one.
+
+      Pops come in priority order, equal priorities first in, first out, but
+      there is no update(): a cheaper path to a queued item has to be pushed
+      as a second entry, and the caller skips the stale one when it comes up.
+      Entries must be picklable.
+    """
+    MAX_RUNS = 64
+    ENTRY_OVERHEAD = 200 # bytes an entry takes in memory beyond its pickled size, roughly
+
+    def __init__(self, memoryBudget, directory=None):
+        self.memoryBudget = memoryBudget
+        self.directory = directory # for the runs; None for the system's temporary directory
+        self.capacity = None       # entries kept in memory, estimated from the first one pushed
+        self.heap = []             # (priority, count, item) entries in memory
+        self.heads = []            # (priority, count, item, run) for the next entry of each run
+        self.count = 0
+        self.size = 0
+        self.spills = 0
+
+    def push(self, item, priority):
+        entry = (priority, self.count, item)
+        if self.capacity is None:
+            entrySize = len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)) + self.ENTRY_OVERHEAD
+            self.capacity = max(1, self.memoryBudget // entrySize)
+        heapq.heappush(self.heap, entry)
+        self.count += 1
+        self.size += 1
+        if len(self.heap) > self.capacity:
+            self._spill(sorted(self.heap))
+            self.heap = []
+
+    def pop(self):
+        heap, heads = self.heap, self.heads
+        if heads and (not heap or heads[0][:2] < heap[0][:2]):
+            priority, count, item, run = heapq.heappop(heads)
+            self._advance(run)
+        else:
+            priority, count, item = heapq.heappop(heap)
+        self.size -= 1
+        return item
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def _spill(self, entries):
+        "Writes the sorted entries out as a new run, merging the runs if there are too many."
+        if len(self.heads) >= self.MAX_RUNS:
+            runs = [itertools.chain([head[:3]], self._read(head[3])) for head in self.heads]
+            self.heads = []
+            entries = heapq.merge(entries, *runs)
+        run = tempfile.TemporaryFile(dir=self.directory)
+        for entry in entries:
+            pickle.dump(entry, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self.spills += 1
+        self._advance(run)
+
+    def _read(self, run):
+        "Yields the entries left in a run, then closes (and so deletes) it."
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                run.close()
+                return
+
+    def _advance(self, run):
+        "Queues the next entry of a run as its head, or closes the run if it is used up."
+        try:
+            entry = pickle.load(run)
+        except EOFError:
+            run.close()
+            return
+        heapq.heappush(self.heads, entry + (run,))
+
+class DiskHashSet:
+    """
+      A set of byte strings kept in a memory-mapped temporary file, so that
+      the operating system pages it out rather than the process running out
+      of memory.  It is an open-addressing hash table with linear probing and
+      fixed-size slots: keys of up to keySize bytes are stored as they are,
+      and longer ones as a keySize-byte BLAKE2 digest, which makes a false
+      match astronomically unlikely.  The table doubles when half full.
+    """
+    def __init__(self, keySize=16, capacity=1 << 16, directory=None):
+        self.keySize = keySize
+        self.width = keySize + 1 # a slot is a tag byte and the key
+        self.directory = directory
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.file = tempfile.TemporaryFile(dir=self.directory)
+        self.file.truncate(capacity * self.width)
+        self.table = mmap.mmap(self.file.fileno(), capacity * self.width)
+
+    def _slotKey(self, key):
+        "Returns key as stored in a slot: its length plus one, or 255 for a digest, then the key."
+        if len(key) <= self.keySize:
+            return bytes([len(key) + 1]) + key.ljust(self.keySize, b'\0')
+        return b'\xff' + hashlib.blake2b(key, digest_size=self.keySize).digest()
+
+    def _find(self, slotKey):
+        "Returns the offset of slotKey's slot, or of the empty slot where it would go."
+        table, width, mask = self.table, self.width, self.capacity - 1
+        index = hash(slotKey) & mask
+        while True:
+            offset = index * width
+            if table[offset] == 0 or table[offset:offset + width] == slotKey:
+                return offset
+            index = (index + 1) & mask
+
+    def __contains__(self, key):
+        return self.table[self._find(self._slotKey(key))] != 0
+
+    def add(self, key):
+        "Adds key to the set; returns False if it was already there."
+        slotKey = self._slotKey(key)
+        offset = self._find(slotKey)
+        if self.table[offset] != 0:
+            return False
+        self.table[offset:offset + self.width] = slotKey
+        self.count += 1
+        if 2 * self.count > self.capacity:
+            self._grow()
+        return True
+
+    def _grow(self):
+        table, file, width = self.table, self.file, self.width
+        self._allocate(2 * self.capacity)
+        for offset in range(0, len(table), width):
+            if table[offset] != 0:
+                slotKey = table[offset:offset + width]
+                newOffset = self._find(slotKey)
+                self.table[newOffset:newOffset + width] = slotKey
+        table.close()
+        file.close()
+
+    def close(self):
+        self.table.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+class UnionFind:
+    """
+      A disjoint-set forest over hashable elements, with path halving and
+      union by size.  Elements are added implicitly the first time they are
+      seen, so edges can be fed in one at a time as they are considered.
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        "Returns the representative of the set containing item"
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            self.size[item] = 1
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        "Merges the sets of a and b; returns False if they were already joined"
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+def wallsDigest(walls):
+    """
+      Returns a hex digest that identifies a walls Grid by its contents, so the
+      tables built for a maze serve every layout with the same walls, wherever
+      its food and agents are.  It is worked out once and kept on the Grid,
+      which all the game states of a layout share.
+    """
+    digest = getattr(walls, '_digest', None)
+    if digest is None:
+        digest = walls._digest = hashlib.sha1(str(walls).encode('utf-8')).hexdigest()
+    return digest
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+CACHE_DIR_BUDGET = 64 << 20 # bytes of files kept in CACHE_DIR
+
+def readCacheFile(name, read):
+    """
+      Returns read(f) for the file name in CACHE_DIR, or None if there is no
+      such file or it is cut short (read may raise EOFError for that).  A file
+      that is read is marked as recently used, see trimCacheDir.
+    """
+    path = os.path.join(CACHE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = read(f)
+        os.utime(path)
+        return data
+    except (EOFError, OSError):
+        return None
+
+def writeCacheFile(name, write):
+    """
+      Saves the file name in CACHE_DIR with write(f).  It is written under a
+      temporary name and then renamed, so readers never see half a file.
+      Caching is best effort: if the tree is read-only nothing is saved, and
+      the data is just computed again next time.
+    """
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        if not os.path.isdir(CACHE_DIR):
+            os.makedirs(CACHE_DIR)
+        with open(path + '.tmp', 'wb') as f:
+            write(f)
+        os.replace(path + '.tmp', path)
+        trimCacheDir()
+    except OSError:
+        pass
+
+def trimCacheDir(budget=CACHE_DIR_BUDGET):
+    """
+      Deletes the least recently used files in CACHE_DIR until the rest take
+      up at most budget bytes, so that caches keyed by layout do not pile up
+      as new layouts come and go.
+    """
+    files = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue # deleted by another process meanwhile
+        files.append((info.st_mtime, info.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )